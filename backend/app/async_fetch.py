@@ -0,0 +1,124 @@
+import time
+import asyncio
+from typing import Optional
+import aiohttp
+from app import utils
+from app.page_archive import PageArchive
+from app.proxy_pool import ProxyPool
+from app.rate_limit import HostRateLimiter
+
+# Upper bound on simultaneous requests across every crawl stage
+max_concurrency = 500
+
+class AsyncFetcher:
+    """Fetches pages on one event loop over pooled keep-alive connections.
+
+    Concurrency is bounded by a semaphore instead of a thread per request.
+    Every attempt draws a proxy from the pool and reports its latency, or its
+    failure, back to it. Error responses are retried with exponential backoff
+    and timeouts and connection errors after a fixed delay, except 403 and
+    404, which are not retried. URLs that exhaust their retries are recorded
+    in failed_urls.jsonl.
+
+    With an archive, fetched pages are stored in it and pages it already holds
+    are revalidated with conditional requests; a 304 is served from disk.
+
+    With a rate limiter, every attempt, retries included, waits for a token
+    from its host's bucket, and 429/5xx responses slow that host down.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = max_concurrency,
+        proxy_pool: Optional[ProxyPool] = utils.proxy_pool,
+        timeout: float = 30,
+        archive: Optional[PageArchive] = None,
+        rate_limiter: Optional[HostRateLimiter] = None
+    ):
+        self.concurrency = concurrency
+        self.proxy_pool = proxy_pool
+        self.archive = archive
+        self.rate_limiter = rate_limiter
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.semaphore = None
+        self.session = None
+
+    async def __aenter__(self):
+        if self.proxy_pool is not None:
+            # Downloading and checking the proxy list blocks; keep it off the event loop
+            await asyncio.to_thread(self.proxy_pool.ensure_loaded)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Fetch a page, returning its content or None once it cannot be retrieved."""
+        async with self.semaphore:
+            return await self._fetch_with_retries(url)
+
+    async def _fetch_with_retries(self, url: str) -> Optional[bytes]:
+        retries = 0
+        while retries < utils.max_retries:
+            proxy = self.proxy_pool.acquire() if self.proxy_pool else None
+            # Archive lookups and writes touch the disk; run them off the event loop
+            headers = await asyncio.to_thread(self.archive.validators, url) if self.archive is not None else {}
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                async with self.session.get(url, proxy=proxy, headers=headers) as response:
+                    self._report(proxy, time.monotonic() - started)
+                    if self.rate_limiter is not None:
+                        # The origin pushing back slows the whole crawl down, not just this URL
+                        if response.status == 429 or response.status >= 500:
+                            self.rate_limiter.backoff(url)
+                        elif response.status < 400:
+                            self.rate_limiter.recover(url)
+                    # Non-recoverable error; no need to retry
+                    if response.status in (403, 404):
+                        return None
+                    if response.status == 304 and headers:
+                        return await asyncio.to_thread(self.archive.not_modified, url)
+                    content = await response.read()
+                    if response.status == 200 and content:
+                        if self.archive is not None:
+                            await asyncio.to_thread(
+                                self.archive.store, url, content, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                            )
+                        return content
+
+                retries += 1
+                if retries == utils.max_retries:
+                    print(f"Error for {url}: Status code {response.status}, reached max retries ({utils.max_retries}).")
+                await asyncio.sleep(min(1.5 ** retries, utils.max_wait_time))
+
+            except asyncio.TimeoutError:
+                self._report(proxy)
+                retries += 1
+                if retries == utils.max_retries:
+                    print(f"Timeout occurred for {url}, reached max retries ({utils.max_retries}).")
+                await asyncio.sleep(utils.retry_delay)
+
+            except aiohttp.ClientError as e:
+                self._report(proxy)
+                retries += 1
+                if retries == utils.max_retries:
+                    print(f"Request error for {url}: {e}, reached max retries ({utils.max_retries}).")
+                await asyncio.sleep(utils.retry_delay)
+
+        print(f"Failed to fetch {url} after {utils.max_retries} retries. Saving to failed_urls.jsonl")
+        await asyncio.to_thread(utils.record_failed_url, url)
+        return None
+
+    def _report(self, proxy: Optional[str], latency: Optional[float] = None):
+        """Feed the outcome of an attempt back into the proxy scores; None latency is a failure."""
+        if proxy is None:
+            return
+        if latency is None:
+            self.proxy_pool.report_failure(proxy)
+        else:
+            self.proxy_pool.report_success(proxy, latency)
@@ -0,0 +1,277 @@
+import os
+import sys
+import shutil
+import logging
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+from app.name_index import NameIndex
+from app.rollups import AthleteRollups
+
+logger = logging.getLogger(__name__)
+
+ATHLETES_COLUMNS = [
+    "id", "name", "gender", "born", "died", "height", "weight", "noc", "roles",
+    "game", "team", "sport", "event", "position", "image_url"
+]
+
+# Low-cardinality columns stored as dictionary-encoded integer codes
+CATEGORICAL_COLUMNS = ["game", "sport", "team", "noc", "gender", "position", "roles"]
+
+# Ids are looked up in a dense offsets table unless they are this sparse
+MAX_DENSE_ID_RATIO = 8
+
+# "categorical" keeps CATEGORICAL_COLUMNS as codes, "object" keeps the plain object-dtype frame
+ATHLETES_STORE_MODE = os.getenv("ATHLETES_STORE_MODE", "categorical")
+
+# Columnar copy of athletes.csv, partitioned by game and tagged with the CSV version it came from
+DATASET_VERSION_FILE = "_source_version"
+
+# Bumped when the dataset layout changes, so datasets written by older code are rebuilt
+DATASET_FORMAT = 3
+
+# Position of each row in athletes.csv; row positions are part of pagination
+# cursors, so both load paths must return the rows in the same order
+ROW_NUMBER_COLUMN = "_row"
+
+# Partition value standing in for a missing game; pyarrow cannot read back a
+# dataset whose partition column holds nulls
+MISSING_GAME = "__missing__"
+
+def write_athletes_dataset(csv_path: str, dataset_dir: str, version: str):
+    """Write athletes.csv as a Parquet dataset partitioned by game.
+
+    The dataset is built next to the target directory and moved into place
+    once complete, so readers never see a partial dataset.
+    """
+    df = read_athletes_csv(csv_path, categorical=True)
+    df[ROW_NUMBER_COLUMN] = np.arange(len(df), dtype=np.int64)
+    if df["game"].isna().any():
+        df["game"] = df["game"].cat.add_categories([MISSING_GAME]).fillna(MISSING_GAME)
+    # Grouping the rows by game first lets each partition be written as a single row group
+    df = df.sort_values("game", kind="stable")
+    staging_dir = f"{dataset_dir}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    df.to_parquet(staging_dir, engine="pyarrow", partition_cols=["game"], index=False)
+    with open(os.path.join(staging_dir, DATASET_VERSION_FILE), 'w', encoding='utf-8') as f:
+        f.write(f"{DATASET_FORMAT} {version}")
+
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    os.replace(staging_dir, dataset_dir)
+    logger.info(f"Wrote {len(df)} athlete rows to {dataset_dir}")
+
+def dataset_is_current(dataset_dir: str, version: str) -> bool:
+    """Check whether the dataset was written from the given version of athletes.csv."""
+    try:
+        with open(os.path.join(dataset_dir, DATASET_VERSION_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() == f"{DATASET_FORMAT} {version}"
+    except OSError:
+        return False
+
+def read_athletes_dataset(dataset_dir: str, categorical: bool = True) -> pd.DataFrame:
+    """Read the partitioned dataset, with its rows in athletes.csv order."""
+    df = pd.read_parquet(dataset_dir, engine="pyarrow")
+    df = df.sort_values(ROW_NUMBER_COLUMN, kind="stable", ignore_index=True)
+    if MISSING_GAME in df["game"].cat.categories:
+        df["game"] = df["game"].cat.remove_categories([MISSING_GAME])
+    # The partition column is appended last; restore the CSV column order
+    df = df[[column for column in ATHLETES_COLUMNS if column in df.columns]]
+    if not categorical:
+        df = df.astype({column: object for column in CATEGORICAL_COLUMNS if column in df.columns})
+        return df.where(pd.notnull(df), None)
+    return df
+
+def read_athletes_csv(file_path: str, categorical: bool = True) -> pd.DataFrame:
+    """Read athletes.csv, dictionary-encoding the low-cardinality columns if requested."""
+    if not categorical:
+        df = pd.read_csv(file_path)
+        df.replace([np.inf, -np.inf], None, inplace=True)
+        return df.where(pd.notnull(df), None)
+
+    # Missing values stay NaN here and are only converted for the rows being returned
+    return pd.read_csv(file_path, dtype={column: "category" for column in CATEGORICAL_COLUMNS})
+
+class AthleteStore:
+    """In-memory athletes table with the lookup structures used by the API.
+
+    Categorical columns are filtered by resolving the query against their
+    pre-lowercased dictionary once, then comparing integer codes. Columns left
+    as object dtype fall back to lowercasing the column values.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: Optional[str] = None):
+        self.df = df
+        self.version = version
+        self.codes = {}
+        self.lowered_categories = {}
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+                self.codes[column] = df[column].cat.codes.to_numpy()
+                self.lowered_categories[column] = df[column].cat.categories.astype(str).str.lower()
+        self.name_index = NameIndex(df['name'])
+        self.rollups = AthleteRollups(df)
+
+        # Partition rows by game; each game's rows are one ascending slice of game_order
+        self.game_order = None
+        self.game_offsets = None
+        if 'game' in self.codes:
+            game_codes = self.codes['game']
+            self.game_order = np.argsort(game_codes, kind="stable")
+            self.game_offsets = np.searchsorted(
+                game_codes[self.game_order], np.arange(len(self.lowered_categories['game']) + 1)
+            )
+
+        # Group row positions by athlete id; the stable sort keeps each athlete's
+        # rows in file order, so an athlete's rows are one slice of id_order
+        ids = df['id'].to_numpy()
+        self.id_order = np.argsort(ids, kind="stable")
+        self.sorted_ids = ids[self.id_order]
+        self.id_offsets = None
+        if len(ids) and np.issubdtype(ids.dtype, np.integer) and self.sorted_ids[0] >= 0:
+            max_id = int(self.sorted_ids[-1])
+            if max_id <= MAX_DENSE_ID_RATIO * len(ids):
+                # id_offsets[i]:id_offsets[i + 1] is the slice of id_order holding athlete i
+                self.id_offsets = np.searchsorted(self.sorted_ids, np.arange(max_id + 2))
+
+    @property
+    def mode(self) -> str:
+        return "categorical" if self.codes else "object"
+
+    def column_matches(
+        self,
+        column: str,
+        predicate: Callable,
+        positions: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Evaluate a predicate over lowercased column values, returning a boolean array.
+
+        The predicate receives lowercased strings and must treat missing values as
+        non-matching. Only the given row positions are checked when provided.
+        """
+        if column in self.codes:
+            code_set = np.flatnonzero(np.asarray(predicate(self.lowered_categories[column]), dtype=bool))
+            codes = self.codes[column] if positions is None else self.codes[column][positions]
+            if len(code_set) == 1:
+                return codes == code_set[0]
+            return np.isin(codes, code_set)
+
+        values = self.df[column] if positions is None else self.df[column].iloc[positions]
+        return np.asarray(predicate(values.str.lower()), dtype=bool)
+
+    def filter_positions(
+        self,
+        game: Optional[str] = None,
+        sport: Optional[str] = None,
+        role: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> np.ndarray:
+        """Return the sorted row positions matching the athlete query filters."""
+        # The name index narrows the rows before the column filters run
+        positions = self.name_index.search(name) if name else None
+
+        filters = []
+        if game:
+            game = game.lower()
+            if positions is None and self.game_offsets is not None:
+                # Only the rows of the requested game's partition are touched
+                positions = self.game_partition(game)
+            else:
+                filters.append(('game', lambda values: values == game))
+        if sport:
+            sport = sport.lower()
+            filters.append(('sport', lambda values: values.str.contains(sport, na=False)))
+        if role:
+            role = role.lower()
+            filters.append(('roles', lambda values: values.str.contains(role, na=False)))
+
+        for column, predicate in filters:
+            if positions is None:
+                positions = np.flatnonzero(self.column_matches(column, predicate))
+            else:
+                positions = positions[self.column_matches(column, predicate, positions)]
+
+        if positions is None:
+            return np.arange(len(self.df))
+        return positions
+
+    def game_partition(self, game: str) -> np.ndarray:
+        """Return the sorted row positions of the game whose lowercased name is given."""
+        code_set = np.flatnonzero(np.asarray(self.lowered_categories['game'] == game, dtype=bool))
+        slices = [self.game_order[self.game_offsets[code]:self.game_offsets[code + 1]] for code in code_set]
+        if not slices:
+            return self.game_order[:0]
+        if len(slices) == 1:
+            return slices[0].copy()
+        return np.sort(np.concatenate(slices))
+
+    def athlete_positions(self, athlete_id: int) -> np.ndarray:
+        """Return the row positions of one athlete in file order (empty if unknown)."""
+        if self.id_offsets is not None:
+            if not 0 <= athlete_id < len(self.id_offsets) - 1:
+                return self.id_order[:0]
+            return self.id_order[self.id_offsets[athlete_id]:self.id_offsets[athlete_id + 1]]
+
+        start = np.searchsorted(self.sorted_ids, athlete_id, side="left")
+        end = np.searchsorted(self.sorted_ids, athlete_id, side="right")
+        return self.id_order[start:end]
+
+    def records(self, positions: np.ndarray, columns: Optional[list] = None) -> list:
+        """Decode the given rows into JSON-ready dictionaries."""
+        rows = self.df.iloc[positions]
+        if columns is not None:
+            rows = rows[columns]
+        rows = rows.astype(object)
+        return rows.where(rows.notna(), None).to_dict(orient="records")
+
+    def memory_usage(self) -> dict:
+        """Report the resident size of the store next to its object-dtype equivalent."""
+        column_bytes = self.df.memory_usage(deep=True)
+        object_bytes = int(column_bytes.sum())
+        for column, codes in self.codes.items():
+            # Object storage holds one pointer per row plus one boxed string per row
+            category_sizes = np.array([sys.getsizeof(value) for value in self.df[column].cat.categories])
+            counts = np.bincount(codes[codes >= 0], minlength=len(category_sizes))
+            object_bytes += int(counts @ category_sizes) + 8 * len(codes) - int(column_bytes[column])
+
+        frame_bytes = int(column_bytes.sum())
+        index_bytes = self.name_index.nbytes + self.id_order.nbytes + self.sorted_ids.nbytes
+        for array in (self.id_offsets, self.game_order, self.game_offsets):
+            if array is not None:
+                index_bytes += array.nbytes
+        return {
+            "mode": self.mode,
+            "rows": len(self.df),
+            "frame_bytes": frame_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": frame_bytes + index_bytes,
+            "object_frame_bytes": object_bytes,
+        }
+
+def build_athlete_store(
+    file_path: str,
+    version: Optional[str] = None,
+    dataset_dir: Optional[str] = None
+) -> AthleteStore:
+    """Load athletes data in the configured mode and build its lookup structures.
+
+    The columnar dataset is preferred when it was written from this version of
+    the CSV; otherwise the CSV is parsed.
+    """
+    categorical = ATHLETES_STORE_MODE == "categorical"
+    df = None
+    if dataset_dir and version and dataset_is_current(dataset_dir, version):
+        try:
+            df = read_athletes_dataset(dataset_dir, categorical=categorical)
+        except Exception as e:
+            # The CSV is the source of truth; a dataset that can't be read is only slower to serve without
+            logger.warning(f"Cannot read {dataset_dir} ({e}); falling back to {file_path}")
+    if df is None:
+        df = read_athletes_csv(file_path, categorical=categorical)
+    store = AthleteStore(df, version)
+    usage = store.memory_usage()
+    logger.info(
+        f"Loaded {usage['rows']} athlete rows ({usage['mode']} mode): "
+        f"{usage['total_bytes'] / 2**20:.1f} MiB resident, "
+        f"{usage['object_frame_bytes'] / 2**20:.1f} MiB as an object-dtype frame"
+    )
+    return store
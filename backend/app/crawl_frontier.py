@@ -0,0 +1,176 @@
+import heapq
+import asyncio
+import itertools
+from typing import Awaitable, Callable, Iterable, Optional
+from app.async_fetch import AsyncFetcher
+
+class CrawlFrontier:
+    """The one queue every crawl stage feeds, drained by a shared set of fetch workers.
+
+    URLs are deduplicated on insert across all stages and fetched in priority
+    order (lowest first, then first in first out). Each stage registers a
+    handler that receives `(url, content)`, with None content for pages that
+    could not be fetched, and may enqueue further URLs for a later stage, so
+    stages stream into each other instead of waiting for the previous one to
+    finish. A stage is done once its upstream stages are done and none of
+    its pages is queued or in flight; `run` returns when every stage is.
+    Request rates and retries are the fetcher's job.
+    """
+
+    def __init__(self, fetcher: AsyncFetcher, workers: Optional[int] = None):
+        self.fetcher = fetcher
+        self.workers = workers or fetcher.concurrency
+        self.queue = []
+        self.seen = set()
+        self.order = itertools.count()
+        self.stages = {}
+        self.upstream = {}
+        self.on_done = {}
+        self.finished = set()
+        self.counters = {}
+        self.in_flight = 0
+        self.changed = None
+
+    def add_stage(
+        self,
+        name: str,
+        handle: Callable[..., Awaitable],
+        priority: int = 0,
+        upstream: Iterable[str] = (),
+        on_done: Optional[Callable[[], None]] = None
+    ):
+        """Register a stage fed by `upstream`; lower priorities are fetched first.
+
+        `on_done` runs once the stage has finished, e.g. to close its checkpoint file.
+        """
+        self.stages[name] = (priority, handle)
+        self.upstream[name] = tuple(upstream)
+        self.on_done[name] = on_done
+        self.counters.setdefault(name, {"queued": 0, "in_flight": 0, "done": 0, "duplicates": 0})
+
+    def mark_seen(self, urls: Iterable[str]):
+        """Treat URLs handled by an earlier run as duplicates when they are added."""
+        self.seen.update(urls)
+
+    def stage_total(self, stage: str) -> int:
+        """Pages the stage has been given so far, finished or not."""
+        counters = self.counters[stage]
+        return counters["queued"] + counters["in_flight"] + counters["done"]
+
+    def add(self, stage: str, url: str) -> bool:
+        """Enqueue a URL for a stage unless any stage has already seen it."""
+        counters = self.counters[stage]
+        if url in self.seen:
+            counters["duplicates"] += 1
+            return False
+        self.seen.add(url)
+        heapq.heappush(self.queue, (self.stages[stage][0], next(self.order), stage, url))
+        counters["queued"] += 1
+        return True
+
+    def add_many(self, stage: str, urls: Iterable[str]) -> int:
+        return sum(self.add(stage, url) for url in urls)
+
+    async def run(self):
+        self.changed = asyncio.Condition()
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        self._finish_stages()
+
+    def _finish_stages(self):
+        """Mark stages done, upstream first, and run their callbacks."""
+        progressed = True
+        while progressed:
+            progressed = False
+            for name in self.stages:
+                counters = self.counters[name]
+                if name in self.finished or counters["queued"] or counters["in_flight"]:
+                    continue
+                if all(stage in self.finished for stage in self.upstream[name]):
+                    self.finished.add(name)
+                    progressed = True
+                    if self.on_done[name]:
+                        try:
+                            self.on_done[name]()
+                        except Exception as e:
+                            print(f"Error finishing stage {name}: {e}")
+
+    async def _worker(self):
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.queue or not self.in_flight)
+                if not self.queue:
+                    return
+                _, _, stage, url = heapq.heappop(self.queue)
+                self.in_flight += 1
+
+            counters = self.counters[stage]
+            counters["queued"] -= 1
+            counters["in_flight"] += 1
+            try:
+                content = await self.fetcher.fetch(url)
+                await self.stages[stage][1](url, content)
+            except Exception as e:
+                print(f"Error processing {url}: {e}")
+            finally:
+                counters["in_flight"] -= 1
+                counters["done"] += 1
+                self._finish_stages()
+                # Handlers may have queued more work, and the crawl may be finished
+                async with self.changed:
+                    self.in_flight -= 1
+                    self.changed.notify_all()
+
+    def stats(self) -> dict:
+        """Queue depth and progress of every stage."""
+        return {name: dict(counters) for name, counters in list(self.counters.items())}
+
+async def fetch_then_parse(
+    frontier: CrawlFrontier,
+    stage: str,
+    urls: Iterable[str],
+    parse: Callable,
+    handle: Callable[..., Awaitable],
+    executor,
+    parse_workers: int = 1,
+    queue_size: Optional[int] = None,
+    priority: int = 0,
+    upstream: Iterable[str] = ()
+):
+    """Fetch pages through the frontier and parse them in an executor.
+
+    Frontier workers only download bytes and hand them to a bounded queue;
+    `parse_workers` dispatchers each keep one page parsing in the executor,
+    typically a process pool sized to the cores. A full queue blocks the
+    fetchers, so memory stays flat when parsing is the bottleneck.
+    `handle(url, result)` runs on the loop with `parse(content, url)`, or with
+    None when the page could not be fetched; pages that fail to parse or
+    handle are reported and skipped. Besides `urls`, the stage takes the
+    URLs its `upstream` stages add while the frontier runs.
+    """
+    loop = asyncio.get_running_loop()
+    pages = asyncio.Queue(maxsize=queue_size or 2 * parse_workers)
+
+    async def enqueue(url, content):
+        await pages.put((url, content))
+
+    async def dispatch():
+        while True:
+            item = await pages.get()
+            if item is None:
+                return
+            url, content = item
+            try:
+                result = await loop.run_in_executor(executor, parse, content, url) if content else None
+                await handle(url, result)
+            except Exception as e:
+                # Keep dispatching; a dead dispatcher would stall the fetchers
+                print(f"Error processing {url}: {e}")
+
+    async def fetch_all():
+        await frontier.run()
+        for _ in range(parse_workers):
+            await pages.put(None)
+
+    frontier.add_stage(stage, enqueue, priority, upstream)
+    frontier.add_many(stage, urls)
+    await asyncio.gather(fetch_all(), *(dispatch() for _ in range(parse_workers)))
@@ -1,21 +1,59 @@
 import os
-import concurrent.futures
+import re
 import json
+import asyncio
+import threading
+import zlib
+import argparse
+import multiprocessing
+import concurrent.futures
+from typing import Optional
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
+from app import html_parsers
+from app.html_parsers import parser_backend
 import gzip
-from app.utils import fetch_page, init_progress, increment_progress, progress_lock
+from app.crawl_frontier import CrawlFrontier, fetch_then_parse
+from app.data_scraping.journal import CompletionJournal
+from app.page_archive import PageArchive, read_archived_page
+from app.url_list import find_url_list, load_urls
+from app.utils import DATA_DIR, RAW_DATA_DIR, init_progress, increment_progress, progress_lock
 
-# Directory setup
-DATA_DIR = os.path.join(os.getcwd(), "data")
-RAW_DATA_DIR = os.path.join(os.getcwd(), "raw_data")
+# Define file paths
 ATHLETES_CSV = os.path.join(DATA_DIR, "athletes.csv")
-ATHLETES_URLS_JSON = os.path.join(RAW_DATA_DIR, "athletes_urls.json")
+ATHLETES_URLS_JSON = os.path.join(RAW_DATA_DIR, "athletes_urls.jsonl")
 ATHLETES_CONTENT_JSON_GZ = os.path.join(RAW_DATA_DIR, "athletes_content.json.gz")
+ATHLETES_JOURNAL = os.path.join(DATA_DIR, "athletes_journal.jsonl")
+PAGE_ARCHIVE_DIR = os.path.join(RAW_DATA_DIR, "pages")
+
+# Athlete pages go first in the shared frontier; each one finishes a work item
+stage_priority = 0
 
-# Maximum number of workers for concurrent processing
-max_workers = 50  # Adjusted to a reasonable number
+# Processes parsing fetched pages; parsing is CPU-bound, so one per core
+parse_workers = os.cpu_count() or 1
+
+# Define the columns and data types
+columns = [
+    "id", "name", "gender", "born", "died", "height", "weight", "noc", "roles",
+    "game", "team", "sport", "event", "position", "image_url"
+]
+dtypes = {
+    "id": int,
+    "name": str,
+    "gender": str,
+    "born": str,
+    "died": str,
+    "height": str,
+    "weight": str,
+    "noc": str,
+    "roles": str,
+    "game": str,
+    "team": str,
+    "sport": str,
+    "event": str,
+    "position": str,
+    "image_url": str
+}
 
 # Initialize progress data
 progress_data = {
@@ -26,16 +64,11 @@ progress_data = {
     "last_print_time": 0,  # Added this field for progress tracking
 }
 
-def get_content(url):
-    """Scrape athlete content and return it as a list of dictionaries."""
-    session = requests.Session()
-    page_content = fetch_page(url, session)
-    if not page_content:
-        print(f"Error fetching {url}")
-        with progress_lock:
-            increment_progress("Scraping Athlete Data", progress_data)
-        return []
-    
+def parse_athlete_page(page_content, url):
+    """Parse an athlete page into one dictionary per participation."""
+    if parser_backend() == "lxml":
+        return html_parsers.parse_athlete_page(page_content, url)
+
     page = BeautifulSoup(page_content, "lxml")
     
     # Extract biographical data
@@ -129,95 +162,276 @@ def get_content(url):
                 'image_url': image_url
             }
             results.append(result)
-    
-    with progress_lock:
-        increment_progress("Scraping Athlete Data", progress_data)
+
     return results
 
-def scrape_athlete_data():
-    """Main function to scrape athlete data and save it to CSV and JSON."""
-    if not os.path.exists(ATHLETES_URLS_JSON):
-        print("Athlete URLs file not found. Please ensure it exists at:", ATHLETES_URLS_JSON)
-        return
+def athlete_frame(athlete_stats):
+    """Convert parsed athlete rows into a DataFrame with the CSV's columns and types."""
+    df = pd.DataFrame(athlete_stats, columns=columns)
 
-    with open(ATHLETES_URLS_JSON, 'r') as file:
-        athlete_urls = json.load(file)
-    
-    total_urls = len(athlete_urls)
+    # Ensure data types are correct
+    for col, dtype in dtypes.items():
+        if col in df.columns:
+            try:
+                df[col] = df[col].astype(dtype)
+            except ValueError:
+                # Handle cases where conversion fails
+                df[col] = df[col].where(df[col].notnull(), None)
+    return df
 
-    init_progress(total_urls, progress_data)
-    
-    # Define the columns and data types
-    columns = [
-        "id", "name", "gender", "born", "died", "height", "weight", "noc", "roles",
-        "game", "team", "sport", "event", "position", "image_url"
-    ]
-    dtypes = {
-        "id": int,
-        "name": str,
-        "gender": str,
-        "born": str,
-        "died": str,
-        "height": str,
-        "weight": str,
-        "noc": str,
-        "roles": str,
-        "game": str,
-        "team": str,
-        "sport": str,
-        "event": str,
-        "position": str,
-        "image_url": str
-    }
+class AthleteBatchWriter:
+    """Writes parsed athletes to the CSV, the JSON dump and the journal in batches.
+
+    Athletes are buffered until `max_rows` rows are pending or `max_delay`
+    seconds have passed. Each batch costs one dtype conversion, one CSV
+    append, one gzip write and one journal write, done on a worker thread so
+    the event loop keeps fetching. A batch is journaled only after its rows
+    are in both files, so a resumed run can truncate to the last batch.
+    """
+
+    def __init__(self, csv_path, gz_file, journal=None, first_entry=True, max_rows=5000, max_delay=2.0):
+        self.csv_path = csv_path
+        self.gz_file = gz_file
+        self.journal = journal
+        self.first_entry = first_entry
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.pending = []
+        self.pending_rows = 0
+        self.task = None
+        self.closed = False
+        self.wake = None
+
+    @property
+    def full(self):
+        return self.pending_rows >= self.max_rows
+
+    def add(self, url, athlete_stats):
+        """Buffer one athlete's rows; an athlete without rows is still journaled."""
+        with self.lock:
+            self.pending.append((url, athlete_stats))
+            self.pending_rows += len(athlete_stats)
+        if self.full and self.wake is not None:
+            self.wake.set()
+
+    def flush(self):
+        """Write everything buffered so far as one batch."""
+        with self.lock:
+            batch, self.pending, self.pending_rows = self.pending, [], 0
+        if not batch:
+            return
+
+        rows = [row for _, athlete_stats in batch for row in athlete_stats]
+        if rows:
+            athlete_frame(rows).to_csv(self.csv_path, mode='a', header=False, index=False)
+            self.gz_file.write(('' if self.first_entry else ',\n') + ',\n'.join(json.dumps(row) for row in rows))
+            self.gz_file.flush()
+            self.first_entry = False
+
+        if self.journal is not None:
+            csv_end = os.path.getsize(self.csv_path)
+            self.journal.append_many(
+                {"url": url, "id": int(url.split('/')[-1]), "csv_end": csv_end} for url, _ in batch
+            )
+
+    def start(self):
+        """Start flushing in the background of the running event loop."""
+        self.wake = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            await asyncio.to_thread(self.flush)
+
+    async def close(self):
+        """Stop the background flushing and write what is left."""
+        self.closed = True
+        self.wake.set()
+        await self.task
+        self.flush()
+
+def read_gzip_prefix(path):
+    """Decompress as much of a possibly truncated, multi-member gzip file as can be read."""
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    chunks = []
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            chunks.append(decompressor.decompress(data))
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        data = decompressor.unused_data
+    return b''.join(chunks).decode('utf-8', errors='ignore')
+
+def recover_athlete_records(path, completed_ids):
+    """Return the records of journaled athletes from an interrupted run's JSON dump."""
+    if not os.path.exists(path):
+        return []
+
+    # Entries are single-line JSON objects separated by ",\n"; a torn last entry fails to parse
+    text = read_gzip_prefix(path).removeprefix('[').removesuffix('\n]')
+    records = []
+    for entry in text.split(',\n'):
+        try:
+            record = json.loads(entry)
+        except json.JSONDecodeError:
+            continue
+        if record.get('id') in completed_ids:
+            records.append(record)
+    return records
+
+async def scrape_athlete_data(frontier: CrawlFrontier, upstream: Optional[str] = None):
+    """Main function to scrape athlete data and save it to CSV and JSON.
+
+    Athlete URLs come from the `upstream` stage as it discovers them, or
+    from athletes_urls.jsonl without one.
+    """
+    athlete_urls = []
+    if upstream is None:
+        if find_url_list(ATHLETES_URLS_JSON) is None:
+            print("Athlete URLs file not found. Please ensure it exists at:", ATHLETES_URLS_JSON)
+            return
+        athlete_urls = load_urls(ATHLETES_URLS_JSON)
+
+    # Athletes finished by an interrupted run, in completion order; the
+    # frontier drops their URLs however they are discovered
+    journal = CompletionJournal(ATHLETES_JOURNAL)
+    completed = journal.load() if os.path.exists(ATHLETES_CSV) else []
+    completed_urls = {entry["url"] for entry in completed}
+    frontier.mark_seen(completed_urls)
+    pending_urls = [url for url in athlete_urls if url not in completed_urls]
+
+    init_progress(len(pending_urls), progress_data)
     
-    # Create the CSV file with headers if it doesn't exist
-    if not os.path.exists(ATHLETES_CSV):
+    gz_mode = 'wt'
+    first_entry = True
+    if completed:
+        print(f"Resuming athlete scraping: {len(completed_urls)} athletes already completed")
+
+        # Drop rows written after the last journaled athlete; that athlete is fetched again
+        os.truncate(ATHLETES_CSV, completed[-1]["csv_end"])
+
+        # Rewrite the JSON dump with only the journaled athletes, then append to it
+        records = recover_athlete_records(ATHLETES_CONTENT_JSON_GZ, {entry["id"] for entry in completed})
+        with gzip.open(ATHLETES_CONTENT_JSON_GZ + '.tmp', 'wt', encoding='utf-8') as gz_file:
+            gz_file.write('[' + ',\n'.join(json.dumps(record) for record in records))
+        os.replace(ATHLETES_CONTENT_JSON_GZ + '.tmp', ATHLETES_CONTENT_JSON_GZ)
+        gz_mode = 'at'
+        first_entry = not records
+        journal.open()
+    else:
+        # Create the journal before the CSV so an interrupted first run is resumed, not skipped
+        journal.remove()
+        journal.open()
+
+        # Start the CSV afresh; rows of an earlier run are replaced, not appended to
         os.makedirs(os.path.dirname(ATHLETES_CSV), exist_ok=True)
         pd.DataFrame(columns=columns).to_csv(ATHLETES_CSV, index=False)
-    else:
-        print(f"CSV file already exists at {ATHLETES_CSV}")
 
     try:
-        with gzip.open(ATHLETES_CONTENT_JSON_GZ, 'wt', encoding='utf-8') as gz_file:
-            gz_file.write('[')  # Start the JSON array
+        with gzip.open(ATHLETES_CONTENT_JSON_GZ, gz_mode, encoding='utf-8') as gz_file:
+            if gz_mode == 'wt':
+                gz_file.write('[')  # Start the JSON array
             
             print("Starting data collection")
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(get_content, url): url for url in athlete_urls}
-                first_entry = True
-                for future in concurrent.futures.as_completed(futures):
-                    url = futures[future]
-                    try:
-                        athlete_stats = future.result()
-                        if athlete_stats:
-                            # Convert to DataFrame
-                            df = pd.DataFrame(athlete_stats, columns=columns)
-                            
-                            # Ensure data types are correct
-                            for col, dtype in dtypes.items():
-                                if col in df.columns:
-                                    try:
-                                        df[col] = df[col].astype(dtype)
-                                    except ValueError:
-                                        # Handle cases where conversion fails
-                                        df[col] = df[col].where(df[col].notnull(), None)
-                            
-                            # Write to CSV
-                            df.to_csv(ATHLETES_CSV, mode='a', header=False, index=False)
-                            
-                            # Write each athlete's data to the gzipped JSON file
-                            for athlete_data in athlete_stats:
-                                if not first_entry:
-                                    gz_file.write(',\n')  # Add a comma before each new entry
-                                json.dump(athlete_data, gz_file)
-                                first_entry = False
-                    except Exception as e:
-                        print(f"Error processing {url}: {e}")
+            writer = AthleteBatchWriter(ATHLETES_CSV, gz_file, journal, first_entry)
+            writer.start()
+
+            async def save(url, athlete_stats):
+                with progress_lock:
+                    progress_data["total"] = frontier.stage_total("athletes")
+                    increment_progress("Scraping Athlete Data", progress_data)
+                if athlete_stats is None:
+                    print(f"Error fetching {url}")
+                    return  # Not journaled, so a resumed run tries it again
+                writer.add(url, athlete_stats)
+
+            # Pages are fetched on the event loop and parsed in worker processes; results
+            # come back to the loop and are handed to the batch writer
+            try:
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    await fetch_then_parse(
+                        frontier, "athletes", pending_urls, parse_athlete_page, save, executor,
+                        parse_workers=parse_workers, priority=stage_priority,
+                        upstream=[upstream] if upstream else []
+                    )
+            finally:
+                await writer.close()
             
             gz_file.write('\n]')  # End the JSON array
+
+        # Every athlete has been processed; the stage is complete
+        journal.remove()
         print(f"Scraping completed. Data saved to {ATHLETES_CSV} and {ATHLETES_CONTENT_JSON_GZ}")
 
     except (OSError, EOFError, json.JSONDecodeError) as e:
         print(f"Error occurred during file writing: {e}")
         print("Please check the file and ensure it is saved correctly.")
+    finally:
+        journal.close()
+
+def parse_archived_athlete(task):
+    """Parse one archived athlete page; runs in a worker process."""
+    url, path = task
+    return parse_athlete_page(read_archived_page(path), url)
+
+def rebuild_athlete_data_from_archive(archive_dir=PAGE_ARCHIVE_DIR, workers=None, batch_size=5000):
+    """Rebuild athletes.csv and the JSON dump from archived pages without any network access.
+
+    Pages are parsed in a process pool and written in the order of
+    athletes_urls.jsonl (or of the archive when that file is missing).
+    """
+    archive = PageArchive(archive_dir)
+    if find_url_list(ATHLETES_URLS_JSON) is not None:
+        athlete_urls = load_urls(ATHLETES_URLS_JSON)
+    else:
+        athlete_urls = sorted(url for url in archive.entries if re.search(r"/athletes/\d+$", url))
+
+    tasks = [(url, archive.path_for(url)) for url in athlete_urls if url in archive]
+    missing = len(athlete_urls) - len(tasks)
+    if missing:
+        print(f"{missing} athlete pages are not in the archive and will be missing from the rebuild")
+
+    init_progress(len(tasks), progress_data)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(RAW_DATA_DIR, exist_ok=True)
+    csv_tmp, gz_tmp = ATHLETES_CSV + '.tmp', ATHLETES_CONTENT_JSON_GZ + '.tmp'
+    pd.DataFrame(columns=columns).to_csv(csv_tmp, index=False)
+
+    with gzip.open(gz_tmp, 'wt', encoding='utf-8') as gz_file, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        gz_file.write('[')
+        writer = AthleteBatchWriter(csv_tmp, gz_file, max_rows=batch_size)
+        for (url, _), athlete_stats in zip(tasks, executor.map(parse_archived_athlete, tasks, chunksize=64)):
+            writer.add(url, athlete_stats)
+            increment_progress("Rebuilding Athlete Data", progress_data)
+            if writer.full:
+                writer.flush()
+        writer.flush()
+        gz_file.write('\n]')
+
+    os.replace(csv_tmp, ATHLETES_CSV)
+    os.replace(gz_tmp, ATHLETES_CONTENT_JSON_GZ)
+    # The rebuilt CSV is complete, so there is nothing left to resume
+    CompletionJournal(ATHLETES_JOURNAL).remove()
+    print(f"Rebuilt {ATHLETES_CSV} from {len(tasks)} archived athlete pages")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild athletes.csv from the page archive without network access.")
+    parser.add_argument("--archive", default=PAGE_ARCHIVE_DIR, help="Page archive directory")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (defaults to the CPU count)")
+    args = parser.parse_args()
+    rebuild_athlete_data_from_archive(args.archive, args.workers)
@@ -2,9 +2,9 @@ import os
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from app.utils import BASE_URL, DATA_DIR
 
-# Directory setup
-DATA_DIR = os.path.join(os.getcwd(), "data")
+# Define file paths
 HOST_CITIES_CSV = os.path.join(DATA_DIR, "host_cities.csv")
 
 # Initialize progress data
@@ -40,7 +40,7 @@ def get_host_cities(season_table_element, season):
 
 def scrape_host_cities():
     """Scrape host cities and save them to a CSV file."""
-    base_url = "https://www.olympedia.org/editions"
+    base_url = f"{BASE_URL}/editions"
     print(f"Fetching data from {base_url}")
 
     try:
@@ -0,0 +1,63 @@
+import os
+import json
+
+class CompletionJournal:
+    """Append-only log of finished work items, one JSON object per line.
+
+    Each entry is written with a single append, so a crash can at worst leave
+    a torn final line; `load` drops it and truncates the file back to the last
+    complete entry so later appends stay parseable.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> list:
+        """Return the complete entries recorded so far."""
+        if not self.exists():
+            return []
+
+        entries = []
+        valid_bytes = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+                valid_bytes += len(line)
+
+        if valid_bytes < os.path.getsize(self.path):
+            print(f"Discarding incomplete entry at the end of {self.path}")
+            os.truncate(self.path, valid_bytes)
+        return entries
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def append(self, entry: dict):
+        os.write(self.fd, (json.dumps(entry) + '\n').encode('utf-8'))
+
+    def append_many(self, entries):
+        """Append several entries with a single write."""
+        data = ''.join(json.dumps(entry) + '\n' for entry in entries)
+        if data:
+            os.write(self.fd, data.encode('utf-8'))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def remove(self):
+        """Delete the journal once the work it tracks has fully completed."""
+        self.close()
+        if self.exists():
+            os.remove(self.path)
@@ -2,14 +2,14 @@ import os
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from app.utils import BASE_URL, DATA_DIR
 
-# Directory setup
-DATA_DIR = os.path.join(os.getcwd(), "data")
+# Define file paths
 NOC_COUNTRIES_CSV = os.path.join(DATA_DIR, "noc_countries.csv")
 
 def scrape_noc_countries():
     """Scrape NOC countries and save them to a CSV file."""
-    url = "https://www.olympedia.org/countries"
+    url = f"{BASE_URL}/countries"
     print(f"Fetching data from {url}")
 
     try:
@@ -2,11 +2,9 @@ import os
 import gzip
 import json
 import pandas as pd
-from app.utils import init_progress, increment_progress, progress_lock
+from app.utils import DATA_DIR, RAW_DATA_DIR, init_progress, print_progress
 
-# Directory setup
-DATA_DIR = os.path.join(os.getcwd(), "data")
-RAW_DATA_DIR = os.path.join(os.getcwd(), "raw_data")
+# Define file paths
 ATHLETES_ROLES_CSV = os.path.join(DATA_DIR, "athletes_roles.csv")
 ATHLETES_CONTENT_JSON_GZ = os.path.join(RAW_DATA_DIR, "athletes_content.json.gz")
 
@@ -19,47 +17,78 @@ progress_data = {
     "last_print_time": 0,
 }
 
+# Roles rows written to the CSV at a time
+batch_size = 10000
+
+def iter_athlete_records(file):
+    """Stream the records of an athletes_content JSON dump without loading it whole.
+
+    The scraper writes one json.dumps record per line between "[" and "]"
+    with ",\n" separators, so each line holds exactly one record.
+    """
+    for line in file:
+        line = line.strip().removeprefix('[').removesuffix(',')
+        if line and line != ']':
+            yield json.loads(line.removesuffix(']'))
+
 def extract_roles():
-    """Extract roles from athlete content and save them to a CSV file."""
+    """Extract one roles row per athlete from the athlete content and save them to a CSV file."""
     if not os.path.exists(ATHLETES_CONTENT_JSON_GZ):
         print(f"Error: {ATHLETES_CONTENT_JSON_GZ} file not found. Cannot extract athlete roles.")
         return
 
     print(f"Reading data from {ATHLETES_CONTENT_JSON_GZ}")
 
-    # Read the GZIP JSON file
+    # Progress is tracked in compressed bytes, since the record count is unknown up front
+    init_progress(os.path.getsize(ATHLETES_CONTENT_JSON_GZ), progress_data)
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    roles_tmp = ATHLETES_ROLES_CSV + ".tmp"
+    seen_ids = set()
+    batch = []
+    written = 0
+
+    def write_batch():
+        nonlocal batch, written
+        pd.DataFrame(batch, columns=['id', 'name', 'roles']).to_csv(roles_tmp, mode='a', header=written == 0, index=False)
+        written += len(batch)
+        batch = []
+
     try:
-        with gzip.open(ATHLETES_CONTENT_JSON_GZ, "rt", encoding="utf-8") as file:
-            # Read JSON array from gzipped file
-            athletes_content = json.load(file)
+        with open(ATHLETES_CONTENT_JSON_GZ, "rb") as raw_file, \
+                gzip.open(raw_file, "rt", encoding="utf-8") as file:
+            if os.path.exists(roles_tmp):
+                os.remove(roles_tmp)
+
+            for count, athlete_data in enumerate(iter_athlete_records(file), start=1):
+                # Every participation repeats the athlete's roles; keep the first
+                athlete_id = athlete_data.get('id')
+                roles = athlete_data.get('roles')
+                if roles and athlete_id not in seen_ids:
+                    seen_ids.add(athlete_id)
+                    batch.append({
+                        'id': athlete_id,
+                        'name': athlete_data.get('name'),
+                        'roles': roles
+                    })
+                    if len(batch) >= batch_size:
+                        write_batch()
+
+                if count % 1000 == 0:
+                    progress_data["current"] = raw_file.tell()
+                    print_progress("Extracting Athlete Roles", progress_data)
+
+            if batch:
+                write_batch()
+            progress_data["current"] = progress_data["total"]
+            print_progress("Extracting Athlete Roles", progress_data)
     except (OSError, EOFError, json.JSONDecodeError) as e:
         print(f"Error occurred: {e}")
         print("The GZIP file might be corrupted or improperly formatted. Please verify the file and try again.")
         return
 
-    total_athletes = len(athletes_content)
-    init_progress(total_athletes, progress_data)
-
-    all_athletes_roles = []
-
-    for athlete_data in athletes_content:
-        roles = athlete_data.get('roles')
-        if roles:
-            athlete_roles = {
-                'id': athlete_data.get('id'),
-                'name': athlete_data.get('name'),
-                'roles': roles
-            }
-            all_athletes_roles.append(athlete_roles)
-
-        with progress_lock:
-            increment_progress("Extracting Athlete Roles", progress_data)
-
-    if all_athletes_roles:
-        # Ensure the data directory exists
-        os.makedirs(DATA_DIR, exist_ok=True)
-        athletes_roles_df = pd.DataFrame(all_athletes_roles)
-        athletes_roles_df.to_csv(ATHLETES_ROLES_CSV, index=False)
-        print(f"Athletes roles data saved to {ATHLETES_ROLES_CSV}")
+    if written:
+        os.replace(roles_tmp, ATHLETES_ROLES_CSV)
+        print(f"Athletes roles data saved to {ATHLETES_ROLES_CSV} ({written} athletes)")
     else:
         print("No athletes with roles found.")
@@ -0,0 +1,6 @@
+import os
+
+def get_data_version(file_path: str) -> str:
+    """Identify the current contents of a data file by its modification time and size."""
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
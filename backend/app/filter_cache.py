@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+
+class FilterCache:
+    """Bounded LRU cache of filter results (matching row positions) for one data version.
+
+    Entries are bounded both by count and by the total size of the cached
+    arrays. reset() switches the cache to a new data version; lookups and
+    stores for any other version are ignored.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.version = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def reset(self, version: str):
+        """Drop every entry and start caching results for the given data version."""
+        with self.lock:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.nbytes = 0
+            self.version = version
+
+    def get(self, version: str, key: Hashable) -> Optional[np.ndarray]:
+        with self.lock:
+            positions = self.entries.get(key) if version == self.version else None
+            if positions is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return positions
+
+    def put(self, version: str, key: Hashable, positions: np.ndarray):
+        if positions.nbytes > self.max_bytes:
+            return
+        # Cached arrays are shared between requests, so they must not be modified
+        positions.flags.writeable = False
+        with self.lock:
+            # Results computed on a replaced data version are not kept
+            if version != self.version:
+                return
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self.entries[key] = positions
+            self.nbytes += positions.nbytes
+            while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "version": self.version,
+                "entries": len(self.entries),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
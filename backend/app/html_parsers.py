@@ -0,0 +1,160 @@
+import os
+import lxml.html
+from lxml import etree
+
+# Parser backends the scrapers can use; bs4 is the reference implementation
+PARSER_BACKENDS = ("bs4", "lxml")
+
+def parser_backend():
+    """Return the backend selected with the PARSER_BACKEND environment variable."""
+    backend = os.getenv("PARSER_BACKEND", "bs4")
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown PARSER_BACKEND {backend!r}, expected one of {PARSER_BACKENDS}")
+    return backend
+
+def document(content):
+    """Parse HTML the way BeautifulSoup(content, "lxml") sees it."""
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass  # Let lxml detect the declared encoding
+    return lxml.html.document_fromstring(content)
+
+# Cheap substring prefilters; has_class then applies BeautifulSoup's exact rule
+find_photos = etree.XPath("//img[contains(@class, 'photo')]")
+find_biodata = etree.XPath("//*[contains(@class, 'biodata')]")
+find_tables = etree.XPath("//table[contains(@class, 'table')]")
+find_active_rows = etree.XPath(".//tr[contains(@class, 'active')]")
+
+def has_class(element, name):
+    """Match like BeautifulSoup's class_ filter: one of the classes, or the whole attribute."""
+    classes = element.get("class")
+    return classes is not None and (name in classes.split() or classes == name)
+
+def text(element):
+    return element.text_content().strip()
+
+def first(elements):
+    return next(elements, None)
+
+def parse_athlete_page(page_content, url):
+    """lxml port of athletes_scraper.parse_athlete_page; returns identical rows."""
+    page = document(page_content)
+
+    # Extract biographical data
+    athlete_id = int(url.split('/')[-1])
+    name_tag = first(page.iter("h1"))
+    name = text(name_tag) if name_tag is not None else None
+    gender, born, died, height, weight, noc, roles, image_url = None, None, None, None, None, None, None, None
+
+    # Extract image URL
+    img_tag = first(img for img in find_photos(page) if has_class(img, "photo"))
+    image_url = img_tag.get("src") if img_tag is not None else None
+
+    # Extract biographical info
+    bio_section = first(element for element in find_biodata(page) if has_class(element, "biodata"))
+    bio_summary = bio_section.iterdescendants("tr") if bio_section is not None else []
+    noc_list = []
+    roles_list = []
+
+    for row in bio_summary:
+        header_tag = first(row.iterdescendants("th"))
+        data_tag = first(row.iterdescendants("td"))
+        header = text(header_tag) if header_tag is not None else None
+        data = text(data_tag) if data_tag is not None else None
+
+        if header == 'Sex':
+            gender = data
+        elif header == 'Born':
+            born = data.split('in')[0].strip()
+        elif header == 'Died':
+            died = data.split('in')[0].strip()
+        elif header == 'Measurements':
+            measurements = data.split(' / ')
+            if len(measurements) == 2:
+                height, weight = measurements
+            elif "kg" in data:
+                weight = data
+            elif "cm" in data:
+                height = data
+        elif header == 'NOC':
+            noc_list.extend([text(link) for link in row.iterdescendants("a")])
+        elif header == 'Roles':
+            roles_list.extend([role.strip() for role in data.split('•')])
+
+    noc = ', '.join(noc_list) if noc_list else None
+    roles = ' • '.join(roles_list) if roles_list else None
+
+    # Extract events and positions
+    results = []
+    tables = [table for table in find_tables(page) if has_class(table, "table")]
+
+    for table in tables:
+        rows = [row for row in find_active_rows(table) if has_class(row, "active")]
+        for row in rows:
+            tds = list(row.iterdescendants("td"))
+            if len(tds) < 3:
+                continue
+            game_info = text(tds[0])
+            discipline = text(tds[1])
+            noc_team = text(tds[2])
+
+            event_row = first(row.itersiblings("tr"))
+            event_link = first(event_row.iterdescendants("a")) if event_row is not None else None
+            if event_link is not None:
+                event = text(event_link)
+                small_tag = first(event_row.iterdescendants("small"))
+                small_text = text(small_tag) if small_tag is not None else ""
+                full_event = f"{event} ({small_text})"
+            else:
+                full_event = discipline
+
+            pos = ""
+            if event_row is not None:
+                event_tds = list(event_row.iterdescendants("td"))
+                if len(event_tds) > 3:
+                    pos = text(event_tds[3])
+            result = {
+                'id': athlete_id,
+                'name': name,
+                'gender': gender,
+                'born': born,
+                'died': died,
+                'height': height,
+                'weight': weight,
+                'noc': noc,
+                'roles': roles,
+                'game': game_info,
+                'team': noc_team,
+                'sport': discipline,
+                'event': full_event,
+                'position': pos,
+                'image_url': image_url
+            }
+            results.append(result)
+
+    return results
+
+def parse_event_urls(content, base_url):
+    """lxml port of events.parse_event_urls."""
+    table_body = first(document(content).iter("tbody"))
+    events_urls = set()
+
+    if table_body is not None:
+        for game in table_body.iterdescendants("tr"):
+            href = list(game.iterdescendants("a"))[1].attrib["href"]
+            events_urls.add(base_url + href)
+    return events_urls
+
+def parse_athlete_urls(content, base_url):
+    """lxml port of athletes.parse_athlete_urls."""
+    table_body = first(document(content).iter("tbody"))
+    local_athletes_urls = set()
+
+    if table_body is not None:
+        for row in table_body.iterdescendants("a"):
+            href = row.get("href", "")
+            if "athlete" in href:
+                local_athletes_urls.add(base_url + href)
+    return local_athletes_urls
@@ -1,22 +1,30 @@
 import os
+import sys
+import asyncio
 import threading
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Path, Query
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Path, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import pandas as pd
 import numpy as np
-import json
-from typing import Iterator, Optional
-from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 from functools import lru_cache
-from app.url_scraping.countries import fetch_and_save_countries
-from app.url_scraping.events import fetch_and_save_events
-from app.url_scraping.athletes import fetch_and_save_athletes
-from app.data_scraping.athletes_scraper import scrape_athlete_data
-from app.data_scraping.host_cities_scraper import scrape_host_cities
-from app.data_scraping.noc_countries_scraper import scrape_noc_countries
-from app.data_scraping.roles_scraper import extract_roles
+from dotenv import load_dotenv
+from app.athlete_store import AthleteStore, build_athlete_store, dataset_is_current, write_athletes_dataset
+from app.data_version import get_data_version
+from app.filter_cache import FilterCache
+from app.metrics import FrameSizes, MetricsMiddleware, MetricsRegistry
+from app.pagination import encode_cursor, decode_cursor
+from app.payload_cache import PayloadCache, payload_response
+from app.paths import DATA_DIR, RAW_DATA_DIR
+from app.pipeline import Pipeline, Stage, deferred
+from app.snapshots import SnapshotManager
+
+# Scraping modules (and the proxy pool) are imported inside the pipeline so the
+# API process only loads what serving needs and does no network I/O at import
+load_dotenv()
 
 app = FastAPI()
 
@@ -33,24 +41,38 @@ app.add_middleware(
     allow_headers=["*"],  # Or restrict to specific headers if necessary
 )
 
-# Directory setup
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-RAW_DATA_DIR = os.path.join(BASE_DIR, "raw_data")
+# Request metrics for the data endpoints, served in Prometheus text format at /metrics
+metrics = MetricsRegistry("olympics_api")
+frame_sizes = FrameSizes()
+app.add_middleware(
+    MetricsMiddleware,
+    registry=metrics,
+    paths=["/athletes", "/athletes/count", "/athletes/{athlete_id}", "/stats/medals", "/stats/participation",
+           "/host-cities", "/noc-countries"]
+)
 
 # Define file paths
-COUNTRIES_URLS_JSON = os.path.join(RAW_DATA_DIR, "countries_urls.json")
-EVENTS_URLS_JSON = os.path.join(RAW_DATA_DIR, "events_urls.json")
-ATHLETES_URLS_JSON = os.path.join(RAW_DATA_DIR, "athletes_urls.json")
+COUNTRIES_URLS_JSON = os.path.join(RAW_DATA_DIR, "countries_urls.jsonl")
+EVENTS_URLS_JSON = os.path.join(RAW_DATA_DIR, "events_urls.jsonl")
+ATHLETES_URLS_JSON = os.path.join(RAW_DATA_DIR, "athletes_urls.jsonl")
+ATHLETES_CONTENT_JSON_GZ = os.path.join(RAW_DATA_DIR, "athletes_content.json.gz")
 ATHLETES_CSV = os.path.join(DATA_DIR, "athletes.csv")
+ATHLETES_JOURNAL = os.path.join(DATA_DIR, "athletes_journal.jsonl")
+PAGE_ARCHIVE_DIR = os.path.join(RAW_DATA_DIR, "pages")
+ATHLETES_DATASET_DIR = os.path.join(DATA_DIR, "athletes_dataset")
 HOST_CITIES_CSV = os.path.join(DATA_DIR, "host_cities.csv")
 NOC_COUNTRIES_CSV = os.path.join(DATA_DIR, "noc_countries.csv")
 ATHLETES_ROLES_CSV = os.path.join(DATA_DIR, "athletes_roles.csv")
+PIPELINE_STATE_JSON = os.path.join(DATA_DIR, "pipeline_state.json")
+PIPELINE_RUNS_JSONL = os.path.join(DATA_DIR, "pipeline_runs.jsonl")
 
 # Global variables with thread safety
 status_message_lock = threading.Lock()
 status_message = "Idle"
 
+# Frontier of the crawl in progress or last run, reported by /status
+crawl_frontier = None
+
 def update_status(message: str):
     global status_message
     with status_message_lock:
@@ -65,67 +87,115 @@ def ensure_directories():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(RAW_DATA_DIR, exist_ok=True)
 
+async def run_crawl_stages():
+    global crawl_frontier
+    from app.async_fetch import AsyncFetcher
+    from app.crawl_frontier import CrawlFrontier
+    from app.page_archive import PageArchive
+    from app.rate_limit import HostRateLimiter
+    from app.url_scraping.events import add_country_stage
+    from app.url_scraping.athletes import add_event_stage
+    from app.data_scraping.athletes_scraper import scrape_athlete_data
+
+    # Pages already archived are revalidated with conditional requests
+    archive = PageArchive(PAGE_ARCHIVE_DIR)
+    # All stages share one frontier and one request budget per host
+    rate_limiter = HostRateLimiter()
+    async with AsyncFetcher(archive=archive, rate_limiter=rate_limiter if rate_limiter.rate else None) as fetcher:
+        crawl_frontier = frontier = CrawlFrontier(fetcher)
+        # Country pages feed event pages, which feed athlete pages, all in one
+        # pass: an athlete is scraped as soon as its URL is found. The URL lists
+        # are still written as they grow; a resumed crawl rediscovers them and
+        # skips the athletes its journal already holds.
+        if add_country_stage(frontier, downstream="events"):
+            add_event_stage(frontier, upstream="countries", downstream="athletes")
+            update_status("Crawling countries, events and athletes...")
+            await scrape_athlete_data(frontier, upstream="events")
+
+    archive.close()
+    logger.info(f"Page archive: {archive.stats()}")
+    logger.info(f"Crawl frontier: {frontier.stats()}, rate limits: {rate_limiter.stats()}")
+
+def run_crawl():
+    # The crawl stages share one event loop and connection pool
+    asyncio.run(run_crawl_stages())
+
+def write_partitioned_dataset():
+    try:
+        write_athletes_dataset(ATHLETES_CSV, ATHLETES_DATASET_DIR, get_data_version(ATHLETES_CSV))
+    except ImportError as e:
+        logger.warning(f"Skipping partitioned athletes dataset, Parquet support is unavailable: {e}")
+
+# Each stage declares the files it reads and writes; stages not connected through
+# those files (host cities and NOC countries vs. the athlete crawl) run concurrently
+pipeline = Pipeline(
+    [
+        Stage("countries", deferred("app.url_scraping.countries:fetch_and_save_countries"),
+              outputs=[COUNTRIES_URLS_JSON]),
+        Stage("crawl", run_crawl, inputs=[COUNTRIES_URLS_JSON],
+              outputs=[ATHLETES_CSV, ATHLETES_CONTENT_JSON_GZ],
+              pending=lambda: os.path.exists(ATHLETES_JOURNAL)),
+        Stage("athletes_dataset", write_partitioned_dataset, inputs=[ATHLETES_CSV],
+              pending=lambda: not dataset_is_current(ATHLETES_DATASET_DIR, get_data_version(ATHLETES_CSV))),
+        Stage("host_cities", deferred("app.data_scraping.host_cities_scraper:scrape_host_cities"),
+              outputs=[HOST_CITIES_CSV]),
+        Stage("noc_countries", deferred("app.data_scraping.noc_countries_scraper:scrape_noc_countries"),
+              outputs=[NOC_COUNTRIES_CSV]),
+        Stage("roles", deferred("app.data_scraping.roles_scraper:extract_roles"), inputs=[ATHLETES_CONTENT_JSON_GZ],
+              outputs=[ATHLETES_ROLES_CSV]),
+    ],
+    state_path=PIPELINE_STATE_JSON,
+    runs_path=PIPELINE_RUNS_JSONL,
+)
+pipeline_lock = threading.Lock()
+
+def run_pipeline(on_status=None) -> dict:
+    """Run the pipeline once; the URLs that fail during the run make up a new failed_urls.jsonl."""
+    from app import utils
+    from app.url_list import migrate_legacy
+
+    # Stages only know the .jsonl names; lists left as .json by older versions still count
+    for path in (COUNTRIES_URLS_JSON, EVENTS_URLS_JSON, ATHLETES_URLS_JSON):
+        if migrate_legacy(path):
+            logger.info(f"Converted {os.path.basename(path)} from its legacy JSON array")
+
+    try:
+        return pipeline.run(on_status=on_status)
+    finally:
+        utils.close_failed_urls()
+
 def check_and_run_data_pipeline():
+    if not pipeline_lock.acquire(blocking=False):
+        logger.info("Pipeline is already running; ignoring this trigger.")
+        return
     try:
         logger.info("Starting pipeline...")
         update_status("Checking if data exists...")
         ensure_directories()
 
-        if not os.path.exists(COUNTRIES_URLS_JSON):
-            update_status("Fetching country URLs...")
-            fetch_and_save_countries()
-        else:
-            logger.info(f"Skipping country URL collection. File exists: {COUNTRIES_URLS_JSON}")
-
-        if not os.path.exists(EVENTS_URLS_JSON):
-            update_status("Fetching event URLs...")
-            fetch_and_save_events()
-        else:
-            logger.info(f"Skipping event URL collection. File exists: {EVENTS_URLS_JSON}")
-
-        if not os.path.exists(ATHLETES_URLS_JSON):
-            update_status("Fetching athlete URLs...")
-            fetch_and_save_athletes()
-        else:
-            logger.info(f"Skipping athlete URL collection. File exists: {ATHLETES_URLS_JSON}")
+        run = run_pipeline(on_status=update_status)
+        failed = [name for name, result in run["stages"].items() if result["status"] in ("failed", "blocked")]
+        update_status(f"Pipeline failed: {', '.join(failed)} did not complete" if failed else "Data scraping completed.")
 
-        if not os.path.exists(ATHLETES_CSV):
-            update_status("Scraping athlete data...")
-            scrape_athlete_data()
-        else:
-            logger.info(f"Skipping athlete data scraping. File exists: {ATHLETES_CSV}")
-        
-        if not os.path.exists(HOST_CITIES_CSV):
-            update_status("Scraping host cities...")
-            scrape_host_cities()
-        else:
-            logger.info(f"Skipping host cities scraping. File exists: {HOST_CITIES_CSV}")
-
-        if not os.path.exists(NOC_COUNTRIES_CSV):
-            update_status("Scraping NOC countries...")
-            scrape_noc_countries()
-        else:
-            logger.info(f"Skipping NOC countries scraping. File exists: {NOC_COUNTRIES_CSV}")
-            
-        if not os.path.exists(ATHLETES_ROLES_CSV):
-            update_status("Extracting athlete roles...")
-            extract_roles()
-        else:
-            logger.info(f"Skipping athlete roles extraction. File exists: {ATHLETES_ROLES_CSV}")
-        
-        update_status("Data scraping completed.")
+        # Serve the new data once its snapshot is fully built
+        athlete_snapshots.refresh()
     except Exception as e:
         logger.error(f"Error occurred: {e}", exc_info=True)
         update_status(f"Pipeline failed: {str(e)}")
+    finally:
+        pipeline_lock.release()
 
 # APScheduler setup
 scheduler = AsyncIOScheduler()
 scheduler.add_job(check_and_run_data_pipeline, 'interval', weeks=1)
-scheduler.start()
 
 @app.on_event("startup")
 async def on_startup():
+    # Started here because the scheduler needs the server's running event loop
+    scheduler.start()
     update_status("Idle")
+    # Warm the athletes snapshot without holding up startup
+    athlete_snapshots.refresh()
 
 @app.on_event("shutdown")
 async def on_shutdown():
@@ -139,13 +209,27 @@ async def run_data_pipeline(background_tasks: BackgroundTasks):
     background_tasks.add_task(check_and_run_data_pipeline)
     return {"message": "Data collection and scraping pipeline triggered."}
 
+def get_proxy_pool_stats() -> Optional[dict]:
+    """Proxy pool stats, or None while no pipeline has loaded the scraping modules."""
+    utils = sys.modules.get("app.utils")
+    return utils.proxy_pool.stats() if utils else None
+
 @app.get("/status")
 def get_status():
-    return {"status": get_status_message()}
-
-# Caching CSV Data
+    snapshot = athlete_snapshots.active
+    return {
+        "status": get_status_message(),
+        "data_version": snapshot.version if snapshot else None,
+        "data_loaded_at": snapshot.loaded_at.isoformat() if snapshot else None,
+        "filter_cache": filter_cache.stats(),
+        "proxy_pool": get_proxy_pool_stats(),
+        "crawl": crawl_frontier.stats() if crawl_frontier else None,
+        "pipeline": pipeline.last_run,
+    }
+
+# Caching CSV Data; passing the file's data version reloads it once it changes
 @lru_cache(maxsize=10)
-def load_csv_as_dataframe(file_path: str) -> pd.DataFrame:
+def load_csv_as_dataframe(file_path: str, version: Optional[str] = None) -> pd.DataFrame:
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="CSV file not found")
     
@@ -153,8 +237,73 @@ def load_csv_as_dataframe(file_path: str) -> pd.DataFrame:
     df.replace([np.inf, -np.inf], None, inplace=True)
     df = df.where(pd.notnull(df), None)
     
+    frame_sizes.track(os.path.basename(file_path), version, df)
     return df
 
+def build_athletes_snapshot(file_path: str, version: str) -> AthleteStore:
+    """Load athletes data into the in-memory store used by the athlete endpoints.
+
+    The partitioned dataset is read instead of the CSV when it is current.
+    """
+    return build_athlete_store(file_path, version, ATHLETES_DATASET_DIR)
+
+# Serialized bodies of the static-per-version endpoints
+payload_cache = PayloadCache()
+
+# Filter results shared by /athletes and /athletes/count
+filter_cache = FilterCache(max_entries=int(os.getenv("FILTER_CACHE_ENTRIES", "256")))
+
+def on_athletes_swap(snapshot):
+    filter_cache.reset(snapshot.version)
+    frame_sizes.track(os.path.basename(ATHLETES_CSV), snapshot.version, snapshot.data.df)
+
+# The athletes data being served; rebuilt in the background and swapped in when athletes.csv changes
+athlete_snapshots = SnapshotManager(ATHLETES_CSV, build_athletes_snapshot, on_swap=on_athletes_swap)
+
+def collect_data_metrics() -> list:
+    """Cache and loaded-data gauges, read when /metrics is scraped."""
+    csv_cache = load_csv_as_dataframe.cache_info()
+    filters = filter_cache.stats()
+    frames = frame_sizes.samples()
+    return [
+        ("olympics_api_csv_cache_hits_total", "counter", "load_csv_as_dataframe cache hits.", [({}, csv_cache.hits)]),
+        ("olympics_api_csv_cache_misses_total", "counter", "load_csv_as_dataframe cache misses.", [({}, csv_cache.misses)]),
+        ("olympics_api_csv_cache_entries", "gauge", "Frames held by the load_csv_as_dataframe cache.", [({}, csv_cache.currsize)]),
+        ("olympics_api_csv_cache_max_entries", "gauge", "Capacity of the load_csv_as_dataframe cache.", [({}, csv_cache.maxsize)]),
+        ("olympics_api_filter_cache_hits_total", "counter", "Athlete filter cache hits.", [({}, filters["hits"])]),
+        ("olympics_api_filter_cache_misses_total", "counter", "Athlete filter cache misses.", [({}, filters["misses"])]),
+        ("olympics_api_frame_rows", "gauge", "Rows of each data frame held in memory, by file and data version.",
+         [({"file": name, "version": version}, rows) for name, version, rows, _ in frames]),
+        ("olympics_api_frame_memory_bytes", "gauge", "Memory of each data frame held in memory, by file and data version.",
+         [({"file": name, "version": version}, nbytes) for name, version, _, nbytes in frames]),
+    ]
+
+metrics.add_collector(collect_data_metrics)
+
+def get_filter_key(
+    game: Optional[str],
+    sport: Optional[str],
+    role: Optional[str],
+    name: Optional[str]
+) -> tuple:
+    """Normalize the athlete filters into the key identifying their result set."""
+    return tuple(value.lower() if value else None for value in (game, sport, role, name))
+
+def get_filtered_positions(
+    store: AthleteStore,
+    game: Optional[str],
+    sport: Optional[str],
+    role: Optional[str],
+    name: Optional[str]
+) -> np.ndarray:
+    """Return the row positions matching the filters, reusing cached results."""
+    key = get_filter_key(game, sport, role, name)
+    positions = filter_cache.get(store.version, key)
+    if positions is None:
+        positions = store.filter_positions(game, sport, role, name)
+        filter_cache.put(store.version, key, positions)
+    return positions
+
 @app.get("/athletes")
 def get_athletes(
     skip: int = Query(0, ge=0, description="Number of records to skip."),
@@ -162,33 +311,51 @@ def get_athletes(
     game: Optional[str] = Query(None, description="Filter by Olympic game (e.g., '2020 Summer Olympics')."),
     sport: Optional[str] = Query(None, description="Filter by sport."),
     role: Optional[str] = Query(None, description="Filter by role."),
-    name: Optional[str] = Query(None, description="Filter by athlete name (partial match).")
+    name: Optional[str] = Query(None, description="Filter by athlete name (partial match)."),
+    cursor: Optional[str] = Query(None, description="Resume after the last page (the previous response's next_cursor); replaces skip.")
 ):
     """
     Retrieve athletes data with pagination and optional filtering.
+
+    Pages can be requested by offset (skip) or by the opaque next_cursor returned
+    with every page, which resumes directly after the last row served.
     """
     if not os.path.exists(ATHLETES_CSV):
         raise HTTPException(status_code=404, detail="File not found")
     try:
-        df = load_csv_as_dataframe(ATHLETES_CSV)
+        store = athlete_snapshots.get().data
+        filter_key = get_filter_key(game, sport, role, name)
 
         # Apply filters
-        if game:
-            df = df[df['game'].str.lower() == game.lower()]
-        if sport:
-            df = df[df['sport'].str.lower().str.contains(sport.lower())]
-        if role:
-            df = df[df['roles'].str.lower().str.contains(role.lower())]
-        if name:
-            df = df[df['name'].str.lower().str.contains(name.lower())]
-
-        total_records = len(df)
+        positions = get_filtered_positions(store, game, sport, role, name)
+
+        total_records = len(positions)
         
         # Apply pagination
-        df = df.iloc[skip: skip + limit]
+        if cursor:
+            try:
+                version, cursor_filters, last_position = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if cursor_filters != filter_key:
+                raise HTTPException(status_code=400, detail="Cursor does not match the requested filters")
+            if version != store.version:
+                raise HTTPException(status_code=410, detail="Athletes data changed since the cursor was issued; restart pagination")
+            # Filtered positions are ascending, so the page starts right after the last row served
+            start = int(np.searchsorted(positions, last_position, side="right"))
+        else:
+            start = skip
+        page = positions[start: start + limit]
+        athletes = store.records(page)
 
-        return JSONResponse(content={"athletes": df.to_dict(orient="records"), "total_records": total_records})
+        next_cursor = None
+        if start + limit < total_records:
+            next_cursor = encode_cursor(store.version, filter_key, page[-1])
 
+        return JSONResponse(content={"athletes": athletes, "total_records": total_records, "next_cursor": next_cursor})
+
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Error retrieving athletes data: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving athletes data: {e}")
@@ -206,19 +373,12 @@ def get_athletes_count(
     if not os.path.exists(ATHLETES_CSV):
         raise HTTPException(status_code=404, detail="Athletes data not found")
     try:
-        df = load_csv_as_dataframe(ATHLETES_CSV)
+        store = athlete_snapshots.get().data
 
         # Apply filters
-        if game:
-            df = df[df['game'].str.lower() == game.lower()]
-        if sport:
-            df = df[df['sport'].str.lower().str.contains(sport.lower())]
-        if role:
-            df = df[df['roles'].str.lower().str.contains(role.lower())]
-        if name:
-            df = df[df['name'].str.lower().str.contains(name.lower())]
+        positions = get_filtered_positions(store, game, sport, role, name)
         
-        return {"total_records": len(df)}
+        return {"total_records": len(positions)}
     except Exception as e:
         logger.error(f"Error counting athletes data: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error counting athletes data: {e}")
@@ -231,15 +391,15 @@ def get_athlete_details(athlete_id: int = Path(..., description="The ID of the a
     if not os.path.exists(ATHLETES_CSV):
         raise HTTPException(status_code=404, detail="Athletes data not found")
     try:
-        df = load_csv_as_dataframe(ATHLETES_CSV)
-        athlete_df = df[df['id'] == athlete_id]
+        store = athlete_snapshots.get().data
+        positions = store.athlete_positions(athlete_id)
 
-        if athlete_df.empty:
+        if len(positions) == 0:
             raise HTTPException(status_code=404, detail="Athlete not found or no events available")
 
         # Extract event details
-        athlete_record = athlete_df.iloc[0].to_dict()
-        event_details = athlete_df[['game', 'sport', 'event', 'team', 'position']].to_dict(orient='records')
+        athlete_record = store.records(positions[:1])[0]
+        event_details = store.records(positions, ['game', 'sport', 'event', 'team', 'position'])
         
         response = {
             "athlete": {
@@ -264,49 +424,110 @@ def get_athlete_details(athlete_id: int = Path(..., description="The ID of the a
         logger.error(f"Error retrieving events for athlete {athlete_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve athlete events")
 
+def get_rollup(
+    rollup: str,
+    group_by: str,
+    game: Optional[str],
+    noc: Optional[str],
+    sport: Optional[str],
+    limit: Optional[int]
+):
+    """Serve a slice of the rollups materialized when the athletes snapshot was built."""
+    if not os.path.exists(ATHLETES_CSV):
+        raise HTTPException(status_code=404, detail="Athletes data not found")
+    try:
+        store = athlete_snapshots.get().data
+        dimensions = [name.strip().lower() for name in group_by.split(",") if name.strip()]
+        filters = {name: value for name, value in (("noc", noc), ("game", game), ("sport", sport)) if value}
+        try:
+            rows = store.rollups.query(rollup, dimensions, filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return JSONResponse(content={
+            "group_by": dimensions,
+            "filters": filters,
+            "total_groups": len(rows),
+            "rows": rows[:limit] if limit else rows,
+        })
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error retrieving {rollup} stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving {rollup} stats: {e}")
+
+@app.get("/stats/medals")
+def get_medal_stats(
+    group_by: str = Query("noc", description="Comma-separated dimensions to group by: noc, game, sport."),
+    game: Optional[str] = Query(None, description="Only count this Olympic game (e.g., '2020 Summer Olympics')."),
+    noc: Optional[str] = Query(None, description="Only count medals won for this NOC (e.g., 'NOR')."),
+    sport: Optional[str] = Query(None, description="Only count this sport."),
+    limit: Optional[int] = Query(None, ge=1, description="Return at most this many groups.")
+):
+    """
+    Retrieve gold, silver and bronze counts grouped by NOC, game and/or sport.
+
+    Team medals count once per team and event; medalists counts the athletes who won them.
+    """
+    return get_rollup("medals", group_by, game, noc, sport, limit)
+
+@app.get("/stats/participation")
+def get_participation_stats(
+    group_by: str = Query("noc", description="Comma-separated dimensions to group by: noc, game, sport."),
+    game: Optional[str] = Query(None, description="Only count this Olympic game (e.g., '2020 Summer Olympics')."),
+    noc: Optional[str] = Query(None, description="Only count athletes competing for this NOC (e.g., 'NOR')."),
+    sport: Optional[str] = Query(None, description="Only count this sport."),
+    limit: Optional[int] = Query(None, ge=1, description="Return at most this many groups.")
+):
+    """
+    Retrieve distinct athletes and event entries grouped by NOC, game and/or sport.
+    """
+    return get_rollup("participation", group_by, game, noc, sport, limit)
+
 @app.get("/host-cities")
-def get_host_cities():
+def get_host_cities(request: Request):
     """
     Retrieve host cities data as a JSON array.
     """
     if not os.path.exists(HOST_CITIES_CSV):
         raise HTTPException(status_code=404, detail="Host cities data not found")
-        
-    def stream_host_cities_as_json_array() -> Iterator[str]:
-        try:
-            df = load_csv_as_dataframe(HOST_CITIES_CSV)
-            records = df.to_dict(orient='records')
-            yield json.dumps(records)
-        except Exception as e:
-            logger.error(f"Error streaming CSV file {HOST_CITIES_CSV}: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Error streaming CSV file: {e}")
-
-    return StreamingResponse(
-        stream_host_cities_as_json_array(),
-        media_type="application/json"
-    )
+
+    try:
+        version = get_data_version(HOST_CITIES_CSV)
+        payload = payload_cache.get(
+            "host-cities",
+            version,
+            lambda: load_csv_as_dataframe(HOST_CITIES_CSV, version).to_dict(orient='records')
+        )
+        return payload_response(request, payload)
+    except Exception as e:
+        logger.error(f"Error serving CSV file {HOST_CITIES_CSV}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error serving CSV file: {e}")
 
 @app.get("/noc-countries")
-def get_noc_countries():
+def get_noc_countries(request: Request):
     """
     Retrieve NOC countries data as a JSON array.
     """
     if not os.path.exists(NOC_COUNTRIES_CSV):
         raise HTTPException(status_code=404, detail="File not found")
-        
-    def stream_noc_countries_as_json_array() -> Iterator[str]:
-        try:
-            df = load_csv_as_dataframe(NOC_COUNTRIES_CSV)
-            records = df.to_dict(orient='records')
-            yield json.dumps(records)
-        except Exception as e:
-            logger.error(f"Error streaming CSV file {NOC_COUNTRIES_CSV}: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Error streaming CSV file: {e}")
-
-    return StreamingResponse(
-        stream_noc_countries_as_json_array(),
-        media_type="application/json"
-    )
+
+    try:
+        version = get_data_version(NOC_COUNTRIES_CSV)
+        payload = payload_cache.get(
+            "noc-countries",
+            version,
+            lambda: load_csv_as_dataframe(NOC_COUNTRIES_CSV, version).to_dict(orient='records')
+        )
+        return payload_response(request, payload)
+    except Exception as e:
+        logger.error(f"Error serving CSV file {NOC_COUNTRIES_CSV}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error serving CSV file: {e}")
+
+@app.get("/metrics")
+def get_metrics():
+    """Serve request, cache and dataset metrics in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
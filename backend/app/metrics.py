@@ -0,0 +1,177 @@
+import time
+import bisect
+import weakref
+import threading
+from typing import Callable, Iterable, Optional, Sequence
+import pandas as pd
+from starlette.routing import Match
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + "}"
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is one bisect and two increments."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: dict) -> list:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum!r}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+class FrameSizes:
+    """Row counts and memory of the data frames currently held in memory.
+
+    Sizes are measured once when a frame is tracked; the entry disappears
+    when the frame is garbage collected, e.g. after a cache eviction or a
+    snapshot swap.
+    """
+
+    def __init__(self):
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    def track(self, name: str, version: Optional[str], df: pd.DataFrame):
+        key = (name, version, id(df))
+        with self.lock:
+            self.frames[key] = (len(df), int(df.memory_usage(index=True, deep=True).sum()))
+        weakref.finalize(df, self._forget, key)
+
+    def _forget(self, key):
+        with self.lock:
+            self.frames.pop(key, None)
+
+    def samples(self) -> list:
+        with self.lock:
+            return [(name, version, rows, nbytes) for (name, version, _), (rows, nbytes) in self.frames.items()]
+
+class MetricsRegistry:
+    """Per-route request metrics plus collectors read at scrape time, in Prometheus text format.
+
+    Collectors return `(name, type, help, [(labels, value)])` tuples, so
+    values that already live elsewhere (cache counters, frame sizes) are
+    read when /metrics is scraped instead of being copied on every request.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.latency = {}
+        self.in_flight = {}
+        self.responses = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def add_routes(self, routes: Iterable[str]):
+        """Expose the routes' series before their first request."""
+        with self.lock:
+            for route in routes:
+                self.in_flight.setdefault(route, 0)
+                self.latency.setdefault(route, Histogram())
+
+    def add_collector(self, collect: Callable[[], Iterable[tuple]]):
+        self.collectors.append(collect)
+
+    def request_started(self, route: str):
+        with self.lock:
+            self.in_flight[route] = self.in_flight.get(route, 0) + 1
+
+    def request_finished(self, route: str, status: int, seconds: float):
+        with self.lock:
+            self.in_flight[route] -= 1
+            histogram = self.latency.get(route)
+            if histogram is None:
+                histogram = self.latency[route] = Histogram()
+            histogram.observe(seconds)
+            key = (route, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self) -> str:
+        name = f"{self.prefix}_http_request_duration_seconds"
+        lines = [
+            f"# HELP {name} Time to serve a request, by route.",
+            f"# TYPE {name} histogram",
+        ]
+        with self.lock:
+            for route, histogram in sorted(self.latency.items()):
+                lines.extend(histogram.lines(name, {"route": route}))
+            request_samples = [({"route": route, "status": status}, count) for (route, status), count in sorted(self.responses.items())]
+            in_flight_samples = [({"route": route}, count) for route, count in sorted(self.in_flight.items())]
+
+        families = [
+            (f"{self.prefix}_http_requests_total", "counter", "Requests served, by route and status code.", request_samples),
+            (f"{self.prefix}_http_requests_in_flight", "gauge", "Requests being served, by route.", in_flight_samples),
+        ]
+        for collect in self.collectors:
+            families.extend(collect())
+
+        for family, metric_type, help_text, samples in families:
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+            lines.extend(f"{family}{format_labels(labels)} {format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight requests for the given route paths.
+
+    Requests are attributed to the first tracked route (in the app's routing
+    order) that fully matches them; everything else passes straight through.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, paths: Iterable[str]):
+        self.app = app
+        self.registry = registry
+        self.paths = set(paths)
+        self.routes = None
+        registry.add_routes(self.paths)
+
+    def match(self, scope) -> Optional[str]:
+        if self.routes is None:
+            self.routes = [route for route in scope["app"].router.routes if getattr(route, "path", None) in self.paths]
+        for route in self.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return route.path
+        return None
+
+    async def __call__(self, scope, receive, send):
+        route = self.match(scope) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.request_started(route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.request_finished(route, status, time.perf_counter() - started)
@@ -0,0 +1,98 @@
+import re
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+# Length of the substrings stored in the inverted index
+NGRAM_SIZE = 3
+
+# Queries matching at most this many distinct names are expanded slice by slice
+# instead of gathering over every row
+MAX_SLICED_NAMES = 256
+
+# Characters that make `str.contains` treat the query as a regular expression
+REGEX_METACHARACTERS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+def ngrams(text):
+    """Return the set of distinct n-grams in the given text."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+class NameIndex:
+    """Inverted trigram index over the lowercased names of a DataFrame column.
+
+    Names are de-duplicated first, since every participation row of an athlete
+    repeats the same name. Searches resolve to distinct names and then expand to
+    the row positions holding them, so results match
+    `names.str.lower().str.contains(query.lower())` in the original row order.
+    """
+
+    def __init__(self, names: pd.Series):
+        codes, uniques = pd.factorize(names.str.lower())
+        self.names = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+        self.codes = codes
+
+        # Group row positions by name so a name's rows form one contiguous slice
+        self.row_order = np.argsort(codes, kind="stable")
+        self.row_offsets = np.searchsorted(codes[self.row_order], np.arange(len(uniques) + 1))
+
+        postings = defaultdict(list)
+        for name_id, name in enumerate(self.names):
+            for gram in ngrams(name):
+                postings[gram].append(name_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the distinct names and the index arrays."""
+        return (
+            int(self.names.memory_usage(deep=True))
+            + self.codes.nbytes
+            + self.row_order.nbytes
+            + self.row_offsets.nbytes
+            + sum(posting.nbytes for posting in self.postings.values())
+        )
+
+    def search(self, query: str) -> np.ndarray:
+        """Return the sorted row positions whose name contains the query."""
+        name_ids = self.matching_name_ids(query.lower())
+        if len(name_ids) == 0:
+            return EMPTY_POSITIONS
+
+        if len(name_ids) <= MAX_SLICED_NAMES:
+            positions = np.concatenate(
+                [self.row_order[self.row_offsets[i]:self.row_offsets[i + 1]] for i in name_ids]
+            )
+            positions.sort()
+            return positions
+
+        # Broad queries: flag the matching names and gather over the row codes;
+        # the extra trailing slot keeps rows without a name (code -1) unmatched
+        matched = np.zeros(len(self.names) + 1, dtype=bool)
+        matched[name_ids] = True
+        return np.flatnonzero(matched[self.codes])
+
+    def matching_name_ids(self, needle: str) -> np.ndarray:
+        """Return the ids of the distinct names containing the lowercased needle."""
+        if REGEX_METACHARACTERS.search(needle):
+            # Keep the regex semantics of `str.contains` for patterns
+            return np.flatnonzero(self.names.str.contains(needle, na=False).to_numpy())
+
+        if len(needle) < NGRAM_SIZE:
+            return np.flatnonzero(self.names.str.contains(needle, regex=False).to_numpy())
+
+        postings = [self.postings.get(gram) for gram in ngrams(needle)]
+        if any(posting is None for posting in postings):
+            return EMPTY_POSITIONS
+
+        # Intersect the shortest posting lists first
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                return EMPTY_POSITIONS
+
+        # Shared trigrams are only a necessary condition; confirm each candidate
+        return np.array([i for i in candidates if needle in self.names.iat[i]], dtype=np.int64)
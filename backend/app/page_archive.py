@@ -0,0 +1,124 @@
+import os
+import gzip
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from app.data_scraping.journal import CompletionJournal
+
+# Rewrite the index once it holds this many superseded lines per live entry
+COMPACT_RATIO = 2
+
+class PageArchive:
+    """Compressed on-disk copies of fetched pages, keyed by URL and content hash.
+
+    Page bodies are stored once per distinct content under
+    objects/<hash[:2]>/<hash>.gz, so refetching an unchanged page costs no
+    extra space. index.jsonl maps each URL to its current hash and the
+    ETag/Last-Modified validators the server sent; the last line for a URL
+    wins. Those validators turn later fetches into conditional requests.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.lock = threading.Lock()
+        self.index_log = CompletionJournal(os.path.join(root, "index.jsonl"))
+
+        self.entries = {}
+        lines = self.index_log.load()
+        for entry in lines:
+            self.entries[entry["url"]] = entry
+        if len(lines) > COMPACT_RATIO * len(self.entries):
+            self.compact()
+
+        self.counters = {"stored": 0, "unchanged": 0, "not_modified": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def object_path(self, content_hash: str) -> str:
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}.gz")
+
+    def path_for(self, url: str) -> Optional[str]:
+        """Path of the compressed body archived for a URL, if there is one."""
+        entry = self.entries.get(url)
+        return self.object_path(entry["sha256"]) if entry else None
+
+    def read(self, url: str) -> Optional[bytes]:
+        path = self.path_for(url)
+        return read_archived_page(path) if path else None
+
+    def validators(self, url: str) -> dict:
+        """Conditional request headers for a URL whose body is archived."""
+        entry = self.entries.get(url)
+        if entry is None or not os.path.exists(self.object_path(entry["sha256"])):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def not_modified(self, url: str) -> Optional[bytes]:
+        """Return the archived body after the server answered 304 Not Modified."""
+        with self.lock:
+            self.counters["not_modified"] += 1
+        return self.read(url)
+
+    def store(self, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Archive a freshly fetched page along with its validators."""
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self.object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Stores run on worker threads; two URLs with the same body may be written at once
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(temp_path, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+
+        entry = {
+            "url": url,
+            "sha256": content_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self.lock:
+            previous = self.entries.get(url)
+            self.counters["unchanged" if previous and previous["sha256"] == content_hash else "stored"] += 1
+            if previous and all(previous.get(key) == entry[key] for key in ("sha256", "etag", "last_modified")):
+                return
+            self.entries[url] = entry
+            if self.index_log.fd is None:
+                self.index_log.open()
+            self.index_log.append(entry)
+
+    def compact(self):
+        """Rewrite the index with only the current entry for each URL."""
+        with self.lock:
+            self.index_log.close()
+            compacted = CompletionJournal(self.index_log.path + ".tmp")
+            compacted.remove()
+            compacted.open()
+            for entry in self.entries.values():
+                compacted.append(entry)
+            compacted.close()
+            os.replace(compacted.path, self.index_log.path)
+
+    def close(self):
+        self.index_log.close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"pages": len(self.entries), **self.counters}
+
+def read_archived_page(path: str) -> bytes:
+    """Decompress one archived page body."""
+    with gzip.open(path, "rb") as file:
+        return file.read()
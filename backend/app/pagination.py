@@ -0,0 +1,17 @@
+import base64
+import binascii
+import json
+
+def encode_cursor(version: str, filters: tuple, last_position: int) -> str:
+    """Encode an opaque cursor resuming after the given row position."""
+    payload = json.dumps({"v": version, "f": list(filters), "k": int(last_position)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor into (version, filters, last_position), raising ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return payload["v"], tuple(payload["f"]), int(payload["k"])
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+# Read before the directories are resolved, so .env can relocate them too
+load_dotenv()
+
+# Every stage reads and writes its files under these two directories: backend/data
+# and backend/raw_data unless OLYMPICS_DATA_DIR and OLYMPICS_RAW_DATA_DIR point
+# elsewhere, e.g. for benchmarks. Kept out of app.utils so the API can import
+# them without the scraping dependencies.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.getenv("OLYMPICS_DATA_DIR", os.path.join(BASE_DIR, "data"))
+RAW_DATA_DIR = os.getenv("OLYMPICS_RAW_DATA_DIR", os.path.join(BASE_DIR, "raw_data"))
@@ -0,0 +1,53 @@
+import json
+import hashlib
+import threading
+from typing import Callable, NamedTuple, Optional
+from fastapi import Request, Response
+
+# Reference data changes at most weekly; clients revalidate with the ETag after this
+CACHE_CONTROL = "public, max-age=3600"
+
+class CachedPayload(NamedTuple):
+    version: str
+    body: bytes
+    etag: str
+
+class PayloadCache:
+    """JSON response bodies serialized once per data version, with strong ETags.
+
+    Any endpoint whose response only depends on a versioned data file can
+    store its body here under its own key.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str, version: str, build: Callable[[], object]) -> CachedPayload:
+        """Return the payload for the given version, serializing build() on a miss."""
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.version != version:
+                body = json.dumps(build()).encode("utf-8")
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                entry = CachedPayload(version, body, etag)
+                self.entries[key] = entry
+            return entry
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def payload_response(request: Request, payload: CachedPayload) -> Response:
+    """Serve a cached payload, answering 304 when the client already holds it."""
+    headers = {"ETag": payload.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
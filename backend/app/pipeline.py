@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from datetime import datetime, timezone
+from importlib import import_module
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+from app.data_scraping.journal import CompletionJournal
+from app.data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[], None]
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    # Reports work left over that makes the stage run even when it looks current
+    pending: Optional[Callable[[], bool]] = None
+
+def deferred(target: str) -> Callable[[], None]:
+    """Callable running "module:function", importing the module only when it runs."""
+    module_name, function_name = target.split(":")
+
+    def run():
+        getattr(import_module(module_name), function_name)()
+    return run
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Pipeline:
+    """Runs stages as a DAG, independent stages concurrently on worker threads.
+
+    A stage depends on the stages producing its inputs. It is skipped when
+    its outputs exist and the content hash of its inputs matches the one
+    recorded after its last successful run; outputs found without a recorded
+    hash (left by an older version) are adopted as current. A failed stage
+    blocks only the stages downstream of it. Every run appends the status
+    and wall time of each stage to `runs_path`.
+    """
+
+    def __init__(self, stages: Iterable[Stage], state_path: str, runs_path: str):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.runs = CompletionJournal(runs_path)
+        self.lock = threading.Lock()
+        self.last_run = None
+
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in self.stages.values()
+        }
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        resolved = set()
+        remaining = dict(self.dependencies)
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if dependencies <= resolved]
+            if not ready:
+                raise ValueError(f"Pipeline stages form a cycle: {', '.join(sorted(remaining))}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    def load_state(self) -> dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("stages", {})
+        state.setdefault("files", {})
+        return state
+
+    def save_state(self, state: dict):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(state, file, indent=4)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def content_hash(self, path: str, state: dict) -> str:
+        """Hash a file's contents, reusing the stored hash while its version is unchanged."""
+        if not os.path.exists(path):
+            return "missing"
+        version = get_data_version(path)
+        cached = state["files"].get(path)
+        if cached and cached["version"] == version:
+            return cached["sha256"]
+        content_hash = file_sha256(path)
+        with self.lock:
+            state["files"][path] = {"version": version, "sha256": content_hash}
+        return content_hash
+
+    def inputs_hash(self, stage: Stage, state: dict) -> str:
+        digest = hashlib.sha256()
+        for path in sorted(stage.inputs):
+            digest.update(f"{path}\0{self.content_hash(path, state)}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def is_current(self, stage: Stage, inputs_hash: str, state: dict) -> bool:
+        if not all(os.path.exists(path) for path in stage.outputs):
+            return False
+        if stage.pending and stage.pending():
+            return False
+        recorded = state["stages"].get(stage.name)
+        return recorded is None or recorded["inputs_hash"] == inputs_hash
+
+    def record(self, stage: Stage, inputs_hash: str, state: dict):
+        with self.lock:
+            state["stages"][stage.name] = {
+                "inputs_hash": inputs_hash,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.save_state(state)
+
+    def run_stage(self, stage: Stage, state: dict) -> dict:
+        started = time.monotonic()
+        try:
+            inputs_hash = self.inputs_hash(stage, state)
+            if self.is_current(stage, inputs_hash, state):
+                logger.info(f"Skipping stage {stage.name}: inputs unchanged and outputs present")
+                status = "skipped"
+            else:
+                logger.info(f"Running stage {stage.name}")
+                stage.run()
+                missing = [path for path in stage.outputs if not os.path.exists(path)]
+                if missing:
+                    raise RuntimeError(f"Stage {stage.name} did not produce {', '.join(missing)}")
+                status = "completed"
+            self.record(stage, inputs_hash, state)
+        except Exception as e:
+            logger.error(f"Stage {stage.name} failed: {e}", exc_info=True)
+            status = "failed"
+        return {"status": status, "seconds": round(time.monotonic() - started, 3)}
+
+    def run(self, on_status: Optional[Callable[[str], None]] = None) -> dict:
+        """Run every stage that is not current and return the run's record."""
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.monotonic()
+        state = self.load_state()
+        results = {}
+        remaining = dict(self.dependencies)
+        running = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.stages), thread_name_prefix="pipeline") as executor:
+            while remaining or running:
+                for name, dependencies in list(remaining.items()):
+                    if not all(dependency in results for dependency in dependencies):
+                        continue
+                    del remaining[name]
+                    failed = [dependency for dependency in dependencies if results[dependency]["status"] in ("failed", "blocked")]
+                    if failed:
+                        logger.warning(f"Not running stage {name}: {', '.join(failed)} did not complete")
+                        results[name] = {"status": "blocked", "seconds": 0.0}
+                    else:
+                        running[executor.submit(self.run_stage, self.stages[name], state)] = name
+                if not running:
+                    continue
+
+                if on_status:
+                    on_status(f"Running pipeline stages: {', '.join(sorted(running.values()))}...")
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+
+        run = {
+            "started_at": started_at,
+            "seconds": round(time.monotonic() - started, 3),
+            "stages": {name: results[name] for name in self.stages},
+        }
+        self.runs.open()
+        self.runs.append(run)
+        self.runs.close()
+        self.last_run = run
+        logger.info(f"Pipeline run finished in {run['seconds']}s: {run['stages']}")
+        return run
@@ -0,0 +1,251 @@
+import time
+import random
+import threading
+import concurrent.futures
+from typing import Callable, Iterable
+
+# Selection weights are integers so the Fenwick tree sums stay exact
+WEIGHT_SCALE = 1_000_000
+
+# Smoothing factor for the per-proxy latency and error averages
+EWMA_ALPHA = 0.2
+
+class FenwickTree:
+    """Prefix sums over integer weights with O(log n) updates and weighted sampling."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.weights = [0] * size
+        self.step = 1 << size.bit_length() if size else 0
+
+    def set(self, index: int, weight: int):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self) -> int:
+        i, total = self.size, 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target: int) -> int:
+        """Return the index whose cumulative weight range contains target (0 <= target < total)."""
+        position, step = 0, self.step
+        while step:
+            following = position + step
+            if following <= self.size and self.tree[following] <= target:
+                position = following
+                target -= self.tree[following]
+            step >>= 1
+        return position
+
+class ProxyState:
+    __slots__ = ("url", "index", "latency", "error_rate", "consecutive_failures",
+                 "ejected_until", "cooldown", "successes", "failures")
+
+    def __init__(self, url: str, index: int, latency: float):
+        self.url = url
+        self.index = index
+        self.latency = latency
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = None
+        self.cooldown = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
+    def weight(self) -> int:
+        if self.ejected:
+            return 0
+        # Fast, reliable proxies get proportionally more traffic
+        return max(1, int(WEIGHT_SCALE / (max(self.latency, 0.01) * (1 + 4 * self.error_rate))))
+
+class ProxyPool:
+    """Proxies scored by latency and errors, with weighted selection and circuit breaking.
+
+    acquire() draws a proxy with probability proportional to its score in
+    O(log n). A proxy failing `failure_threshold` times in a row is ejected
+    for a cooldown that doubles on every failed revalidation. A background
+    thread re-checks ejected proxies once their cooldown expires and reloads
+    the list when fewer than half of the proxies remain healthy, so fetches
+    never wait on proxy testing once the pool has been loaded.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[str]],
+        checker: Callable[[str], bool],
+        failure_threshold: int = 3,
+        base_cooldown: float = 30,
+        max_cooldown: float = 600,
+        maintenance_interval: float = 5,
+        initial_latency: float = 1.0
+    ):
+        self.loader = loader
+        self.checker = checker
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.maintenance_interval = maintenance_interval
+        self.initial_latency = initial_latency
+
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.states = {}
+        self.slots = []
+        self.tree = FenwickTree(0)
+        self.healthy = 0
+        self.loaded_count = 0
+        self.maintainer = None
+        self.reloading = False
+        self.counters = {"selections": 0, "successes": 0, "failures": 0, "ejections": 0,
+                         "restored": 0, "reloads": 0}
+
+    def load(self):
+        """Load the proxy list now, replacing the current proxies."""
+        with self.load_lock:
+            self._replace(list(self.loader()))
+
+    def ensure_loaded(self):
+        """Load the proxy list on first use; concurrent callers wait for the same load."""
+        if not self.slots:
+            with self.load_lock:
+                if not self.slots:
+                    self._replace(list(self.loader()))
+        self._start_maintainer()
+
+    def _replace(self, urls: list):
+        if not urls:
+            raise ValueError("No valid proxies found.")
+        with self.lock:
+            previous = self.states
+            self.states = {}
+            self.slots = []
+            self.tree = FenwickTree(len(urls))
+            for index, url in enumerate(urls):
+                state = ProxyState(url, index, self.initial_latency)
+                old = previous.get(url)
+                if old is not None:
+                    # Keep what we learned about proxies that are still listed
+                    state.latency, state.error_rate = old.latency, old.error_rate
+                self.states[url] = state
+                self.slots.append(state)
+                self.tree.set(index, state.weight())
+            self.healthy = len(urls)
+            self.loaded_count = len(urls)
+
+    def acquire(self) -> str:
+        """Pick a proxy URL, weighted by score."""
+        self.ensure_loaded()
+        with self.lock:
+            self.counters["selections"] += 1
+            total = self.tree.total()
+            if total == 0:
+                # Every proxy is ejected: keep trying random ones rather than stalling fetches
+                self.reload_in_background()
+                return random.choice(self.slots).url
+            return self.slots[self.tree.find(random.randrange(total))].url
+
+    def report_success(self, url: str, latency: float):
+        with self.lock:
+            state = self.states.get(url)
+            if state is None:
+                return
+            self.counters["successes"] += 1
+            state.successes += 1
+            state.consecutive_failures = 0
+            state.latency += EWMA_ALPHA * (latency - state.latency)
+            state.error_rate *= 1 - EWMA_ALPHA
+            if not state.ejected:
+                self.tree.set(state.index, state.weight())
+
+    def report_failure(self, url: str):
+        with self.lock:
+            state = self.states.get(url)
+            if state is None:
+                return
+            self.counters["failures"] += 1
+            state.failures += 1
+            state.consecutive_failures += 1
+            state.error_rate += EWMA_ALPHA * (1 - state.error_rate)
+            if not state.ejected and state.consecutive_failures >= self.failure_threshold:
+                state.cooldown = self.base_cooldown
+                state.ejected_until = time.monotonic() + state.cooldown
+                self.healthy -= 1
+                self.counters["ejections"] += 1
+            self.tree.set(state.index, state.weight())
+            needs_reload = self.healthy < self.loaded_count / 2
+        if needs_reload:
+            self.reload_in_background()
+
+    def reload_in_background(self):
+        """Reload the proxy list on the maintenance thread."""
+        self.reloading = True
+        self._start_maintainer()
+
+    def _start_maintainer(self):
+        if self.maintainer is None:
+            with self.load_lock:
+                if self.maintainer is None:
+                    self.maintainer = threading.Thread(target=self._maintain, name="proxy-pool", daemon=True)
+                    self.maintainer.start()
+
+    def _maintain(self):
+        while True:
+            time.sleep(self.maintenance_interval)
+            try:
+                if self.reloading:
+                    self.load()
+                    with self.lock:
+                        self.counters["reloads"] += 1
+                    self.reloading = False
+                else:
+                    self._revalidate_due()
+            except Exception as e:
+                print(f"Proxy pool maintenance failed: {e}")
+
+    def _revalidate_due(self):
+        now = time.monotonic()
+        with self.lock:
+            due = [state for state in self.slots if state.ejected and state.ejected_until <= now]
+        if not due:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(20, len(due))) as executor:
+            results = list(executor.map(lambda state: bool(self.checker(state.url)), due))
+
+        with self.lock:
+            for state, working in zip(due, results):
+                if self.states.get(state.url) is not state or not state.ejected:
+                    continue
+                if working:
+                    state.ejected_until = None
+                    state.consecutive_failures = 0
+                    state.error_rate /= 2
+                    self.healthy += 1
+                    self.counters["restored"] += 1
+                    self.tree.set(state.index, state.weight())
+                else:
+                    state.cooldown = min(state.cooldown * 2, self.max_cooldown)
+                    state.ejected_until = time.monotonic() + state.cooldown
+
+    def stats(self) -> dict:
+        with self.lock:
+            latencies = [state.latency for state in self.slots if not state.ejected]
+            return {
+                "proxies": len(self.slots),
+                "healthy": self.healthy,
+                "ejected": len(self.slots) - self.healthy,
+                "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+                **self.counters,
+            }
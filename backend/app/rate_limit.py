@@ -0,0 +1,87 @@
+import os
+import time
+import asyncio
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Requests per second allowed to each host; 0 disables the limit
+rate_limit = float(os.getenv("CRAWL_RATE_LIMIT", "50"))
+
+# Slowest rate backing off can reach, in requests per second
+min_rate = 1.0
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second in bursts of up to `burst`.
+
+    The rate adapts to what the origin tolerates: it is halved, at most once
+    a second, when the server pushes back with 429 or 5xx responses, and
+    climbs back towards the configured ceiling while requests succeed.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.last_backoff = 0.0
+        self.throttled = 0
+        self.lock = asyncio.Lock()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out first come, first served
+        async with self.lock:
+            while True:
+                self.refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def backoff(self):
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self.last_backoff >= 1:
+            self.refill(now)
+            self.rate = max(min(min_rate, self.max_rate), self.rate / 2)
+            self.tokens = min(self.tokens, 1.0)
+            self.last_backoff = now
+
+    def recover(self):
+        if self.rate < self.max_rate:
+            self.refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+class HostRateLimiter:
+    """One adaptive token bucket per host, shared by every request the crawl makes."""
+
+    def __init__(self, rate: float = rate_limit, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def acquire(self, url: str):
+        await self.bucket(url).acquire()
+
+    def backoff(self, url: str):
+        self.bucket(url).backoff()
+
+    def recover(self, url: str):
+        self.bucket(url).recover()
+
+    def stats(self) -> dict:
+        return {
+            host: {"rate": round(bucket.rate, 2), "max_rate": bucket.max_rate, "throttled": bucket.throttled}
+            for host, bucket in list(self.buckets.items())
+        }
@@ -0,0 +1,131 @@
+import re
+from itertools import combinations
+from operator import itemgetter
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+# Rollup dimensions and the athletes columns they come from; medals and
+# participation count for the team an athlete represented at those Games
+DIMENSIONS = {"noc": "team", "game": "game", "sport": "sport"}
+
+MEDALS = {"1": "gold", "2": "silver", "3": "bronze"}
+
+# "=3" is a shared bronze; "3 r2/4" is a third place in an early round, not a medal
+MEDAL_POSITION = re.compile(r"^=?([123])$")
+
+def medal_for(position) -> Optional[str]:
+    match = MEDAL_POSITION.match(str(position).strip()) if isinstance(position, (str, int)) else None
+    return MEDALS[match.group(1)] if match else None
+
+def medal_column(positions: pd.Series) -> np.ndarray:
+    """Medal of every row, resolving each distinct position once."""
+    codes, uniques = pd.factorize(positions)
+    medals = np.array([medal_for(position) for position in uniques] + [None], dtype=object)
+    # Missing positions have code -1, which picks the trailing None
+    return medals[codes]
+
+def levels() -> list:
+    """Every combination of dimensions, the empty one (grand totals) included."""
+    names = list(DIMENSIONS)
+    return [level for size in range(len(names) + 1) for level in combinations(names, size)]
+
+class AthleteRollups:
+    """Medal and participation counts per noc/game/sport, materialized once per data load.
+
+    Every combination of dimensions is aggregated up front, and each
+    aggregate is indexed by every subset of its dimensions, so a query is a
+    dictionary lookup returning rows already sorted for display.
+
+    Medals are counted once per team and event, so a relay gold is one gold
+    for its NOC; `medalists` counts the athletes behind them.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        frame = pd.DataFrame({dimension: df[column] for dimension, column in DIMENSIONS.items()})
+        frame["event"] = df["event"]
+        frame["id"] = df["id"]
+        frame["medal"] = medal_column(df["position"])
+        # Rows that cannot be attributed to a noc, game and sport are left out
+        frame = frame.dropna(subset=list(DIMENSIONS))
+
+        medalists = frame.dropna(subset=["medal"])
+        medals = medalists.drop_duplicates(["game", "sport", "event", "noc", "medal"])
+
+        self.medals = {}
+        self.participation = {}
+        for level in levels():
+            self.medals[level] = self._index(level, self._medal_rows(level, medals, medalists))
+            self.participation[level] = self._index(level, self._participation_rows(level, frame))
+
+    @staticmethod
+    def _group(frame: pd.DataFrame, level: tuple):
+        # A constant key stands in for the grand total
+        return frame.groupby(list(level) if level else [pd.Series(0, index=frame.index)], observed=True, sort=False)
+
+    @staticmethod
+    def _keys(index: pd.Index, level: tuple) -> list:
+        if not level:
+            return [()] * len(index)
+        return [tuple(map(str, key)) if isinstance(key, tuple) else (str(key),) for key in index]
+
+    def _medal_rows(self, level: tuple, medals: pd.DataFrame, medalists: pd.DataFrame) -> list:
+        counts = self._group(medals, level)["medal"].value_counts().unstack(fill_value=0)
+        counts = counts.reindex(columns=list(MEDALS.values()), fill_value=0)
+        athletes = self._group(medalists, level)["id"].nunique().reindex(counts.index, fill_value=0)
+        rows = []
+        for key, (gold, silver, bronze), medalist_count in zip(self._keys(counts.index, level), counts.to_numpy(), athletes.to_numpy()):
+            rows.append({
+                **dict(zip(level, key)),
+                "gold": int(gold),
+                "silver": int(silver),
+                "bronze": int(bronze),
+                "total": int(gold + silver + bronze),
+                "medalists": int(medalist_count),
+            })
+        # Medal table order: golds first, then silvers, then bronzes
+        rows.sort(key=lambda row: (-row["gold"], -row["silver"], -row["bronze"], [row[name] for name in level]))
+        return rows
+
+    def _participation_rows(self, level: tuple, frame: pd.DataFrame) -> list:
+        groups = self._group(frame, level)["id"]
+        entries, athletes = groups.size(), groups.nunique()
+        rows = [
+            {**dict(zip(level, key)), "athletes": int(athlete_count), "entries": int(entry_count)}
+            for key, athlete_count, entry_count in zip(self._keys(athletes.index, level), athletes.to_numpy(), entries.reindex(athletes.index).to_numpy())
+        ]
+        rows.sort(key=lambda row: (-row["athletes"], [row[name] for name in level]))
+        return rows
+
+    @staticmethod
+    def _index(level: tuple, rows: list) -> dict:
+        """Index a level's rows by every subset of its dimensions, keeping their order.
+
+        index[filters][values] holds the rows whose (lowercased) values of the
+        `filters` dimensions equal `values`; index[()][()] holds all of them.
+        """
+        lowered = [tuple(row[name].lower() for name in level) for row in rows]
+        index = {(): {(): rows}}
+        for size in range(1, len(level) + 1):
+            for columns in combinations(range(len(level)), size):
+                groups = index[tuple(level[column] for column in columns)] = {}
+                key = itemgetter(*columns)
+                for row, values in zip(rows, lowered):
+                    value = key(values)
+                    groups.setdefault(value if size > 1 else (value,), []).append(row)
+        return index
+
+    def query(self, rollup: str, group_by: Iterable[str], filters: dict) -> list:
+        """Return the rows of a rollup grouped by `group_by` and restricted to exact `filters` values.
+
+        Filtered dimensions stay in the rows, so filtering by game and grouping
+        by noc returns one row per noc holding that game. Matching ignores case.
+        """
+        tables = self.medals if rollup == "medals" else self.participation
+        wanted = set(group_by) | set(filters)
+        unknown = wanted - DIMENSIONS.keys()
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {', '.join(sorted(unknown))}; expected {', '.join(DIMENSIONS)}")
+        level = tuple(name for name in DIMENSIONS if name in wanted)
+        filter_names = tuple(name for name in level if name in filters)
+        return tables[level][filter_names].get(tuple(filters[name].lower() for name in filter_names), [])
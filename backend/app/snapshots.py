@@ -0,0 +1,69 @@
+import os
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple, Optional
+from app.data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+class DatasetSnapshot(NamedTuple):
+    data: Any
+    version: str
+    loaded_at: datetime
+
+class SnapshotManager:
+    """Serves one immutable snapshot of a data file and swaps in rebuilt ones.
+
+    A replacement is built completely (including its indexes) on a background
+    thread and then published with a single reference assignment. Requests keep
+    the snapshot they started with, so in-flight requests finish on the old
+    version while new requests see the new one.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        build: Callable[[str, str], Any],
+        on_swap: Optional[Callable[[DatasetSnapshot], None]] = None
+    ):
+        self.file_path = file_path
+        self.build = build
+        self.on_swap = on_swap
+        self.active = None
+        self.build_lock = threading.Lock()
+
+    def get(self) -> DatasetSnapshot:
+        """Return the active snapshot, building the first one in the caller if needed."""
+        snapshot = self.active
+        if snapshot is None:
+            self.rebuild()
+            snapshot = self.active
+            if snapshot is None:
+                raise FileNotFoundError(self.file_path)
+        return snapshot
+
+    def refresh(self):
+        """Start building a new snapshot in the background if the file has changed."""
+        threading.Thread(target=self._rebuild_logged, name="snapshot-refresh", daemon=True).start()
+
+    def rebuild(self):
+        """Build and publish a snapshot of the current file unless it is already active."""
+        with self.build_lock:
+            if not os.path.exists(self.file_path):
+                return
+            version = get_data_version(self.file_path)
+            if self.active is not None and self.active.version == version:
+                return
+
+            snapshot = DatasetSnapshot(self.build(self.file_path, version), version, datetime.now(timezone.utc))
+            self.active = snapshot
+            if self.on_swap:
+                self.on_swap(snapshot)
+            logger.info(f"Activated snapshot {version} of {self.file_path}")
+
+    def _rebuild_logged(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to build snapshot of {self.file_path}: {e}", exc_info=True)
@@ -0,0 +1,115 @@
+import os
+import json
+from typing import Iterable, Iterator, Optional
+from app.data_scraping.journal import CompletionJournal
+
+def legacy_path(path: str) -> str:
+    """Name older versions used for a URL list: a JSON array in a .json file."""
+    return path.removesuffix(".jsonl") + ".json"
+
+def find_url_list(path: str) -> Optional[str]:
+    """Return the file holding a URL list, falling back to the legacy JSON array."""
+    for candidate in (path, legacy_path(path)):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def read_lines(source: str) -> Iterator[str]:
+    with open(source, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip().removesuffix(',')
+            if line in ('', '[', ']', '[]'):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Ignoring unreadable line in {source}: {line[:80]}")
+
+def read_legacy(source: str) -> Iterator[str]:
+    """Read a JSON array; one left unterminated by an interrupted run is read line by line."""
+    try:
+        with open(source, 'r', encoding='utf-8') as file:
+            yield from json.load(file)
+    except json.JSONDecodeError:
+        yield from read_lines(source)
+
+def iter_urls(path: str) -> Iterator[str]:
+    """Stream the unique URLs of a list, reading the legacy JSON array when that is all there is."""
+    source = find_url_list(path)
+    if source is None:
+        return
+
+    seen = set()
+    for url in read_lines(source) if source == path else read_legacy(source):
+        if url not in seen:
+            seen.add(url)
+            yield url
+
+def load_urls(path: str) -> list:
+    return list(iter_urls(path))
+
+def migrate_legacy(path: str) -> bool:
+    """Convert a legacy JSON array into the JSON Lines list at `path`, unless that exists already."""
+    if os.path.exists(path) or not os.path.exists(legacy_path(path)):
+        return False
+    urls = UrlList(path)
+    urls.open(resume=True)
+    urls.close()
+    return True
+
+class UrlList:
+    """Append-only JSON Lines file of URLs that drops ones it already holds.
+
+    Every call to `add_many` is a single append, so the file is readable by
+    later stages while it grows and a crash leaves at most a torn final line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal = CompletionJournal(path)
+        self.seen = set()
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.seen
+
+    @property
+    def is_open(self) -> bool:
+        return self.journal.fd is not None
+
+    def open(self, resume: bool = False):
+        """Start the list afresh, or keep the URLs already written when resuming.
+
+        Resuming from a legacy JSON array imports its URLs into the new file.
+        """
+        self.seen = set()
+        if resume:
+            if self.journal.exists():
+                self.seen.update(url for url in self.journal.load() if isinstance(url, str))
+            else:
+                legacy_urls = load_urls(self.path)
+                self.journal.open()
+                self.journal.append_many(legacy_urls)
+                self.seen.update(legacy_urls)
+                return
+        else:
+            self.journal.remove()
+        self.journal.open()
+
+    def add(self, url: str) -> bool:
+        return bool(self.add_many([url]))
+
+    def add_many(self, urls: Iterable[str]) -> list:
+        """Append the URLs not written yet and return them."""
+        new_urls = []
+        for url in urls:
+            if url not in self.seen:
+                self.seen.add(url)
+                new_urls.append(url)
+        self.journal.append_many(new_urls)
+        return new_urls
+
+    def close(self):
+        self.journal.close()
@@ -3,11 +3,11 @@ import concurrent.futures
 import requests
 import threading
 from bs4 import BeautifulSoup
-from app.utils import save_json
+from app.utils import BASE_URL, RAW_DATA_DIR
+from app.url_list import UrlList
 
-# Directory setup
-RAW_DATA_DIR = os.path.join(os.getcwd(), "raw_data")
-COUNTRIES_URLS_FILE = os.path.join(RAW_DATA_DIR, "countries_urls.json")
+# Define file paths
+COUNTRIES_URLS_FILE = os.path.join(RAW_DATA_DIR, "countries_urls.jsonl")
 
 max_threads = 100  # Adjust as needed
 country_list = set()  # Thread-safe set for country URLs
@@ -28,7 +28,7 @@ def get_country_urls_worker(base_url, session, country_rows):
             print(f"Error processing country row: {e}")
 
 def fetch_and_save_countries():
-    base_url = "https://www.olympedia.org"
+    base_url = BASE_URL
     session = requests.Session()
 
     print("Fetching country URLs...")
@@ -59,7 +59,10 @@ def fetch_and_save_countries():
 
         # Convert the set to a sorted list and save to file
         unique_country_urls = sorted(country_list)
-        save_json(unique_country_urls, COUNTRIES_URLS_FILE, append=False)
+        countries_urls = UrlList(COUNTRIES_URLS_FILE)
+        countries_urls.open()
+        countries_urls.add_many(unique_country_urls)
+        countries_urls.close()
         print(f"Country URLs collection completed. Total unique country URLs: {len(unique_country_urls)}")
     else:
         print(f"Failed to fetch country URLs content from {initial_url}.")
\ No newline at end of file
@@ -1,37 +1,31 @@
 import os
 import concurrent.futures
 import requests
-import random
 import json
 import time
 import threading
 from dotenv import load_dotenv
+from app.proxy_pool import ProxyPool
+from app.paths import DATA_DIR, RAW_DATA_DIR
+from app.url_list import UrlList
 
 # Load environment variables
 load_dotenv()
 
-# Directory setup
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-RAW_DATA_DIR = os.path.join(BASE_DIR, "raw_data")
-DATA_DIR = os.path.join(BASE_DIR, "data")
-
-proxies_list = set()
-proxies_lock = threading.Lock()
-reload_lock = threading.Lock()
 progress_lock = threading.Lock()
 failed_urls_lock = threading.Lock()
 
+# Site to crawl; overridable to point the scrapers at a local stand-in server
+BASE_URL = os.getenv("OLYMPEDIA_BASE_URL", "https://www.olympedia.org")
+
 # Configuration variables
 max_wait_time = 60   # Maximum wait time between retries (in seconds)
 retry_delay = 5      # Delay between retries (in seconds)
 max_retries = 30     # Maximum number of retries before giving up
-failed_urls = []
-original_proxy_count = 0
+failed_urls = UrlList(os.path.join(RAW_DATA_DIR, 'failed_urls.jsonl'))  # Started afresh on the first failure after close_failed_urls()
 
 def load_proxies(max_workers=20, retry_delay=60):
     """Load proxies from the URL specified in the .env file and check their functionality."""
-    global proxies_list, original_proxy_count
-
     proxy_url = os.getenv('PROXY_URL')
     if not proxy_url:
         raise ValueError("PROXY_URL environment variable is not set in the .env file.")
@@ -57,12 +51,8 @@ def load_proxies(max_workers=20, retry_delay=60):
     if not proxies:
         raise ValueError("No valid proxies found.")
 
-    with proxies_lock:
-        proxies_list = proxies
-        original_proxy_count = len(proxies_list)
-
-    print(f"Loaded {len(proxies_list)} working proxies.")
-    return proxies_list
+    print(f"Loaded {len(proxies)} working proxies.")
+    return proxies
 
 def check_proxy(proxy_line):
     """Check if a proxy works by calling icanhazip.com."""
@@ -70,97 +60,34 @@ def check_proxy(proxy_line):
     if len(parts) == 4:
         ip, port, username, password = parts
         proxy = f"http://{username}:{password}@{ip}:{port}"
-        proxy_dict = {"http": proxy, "https": proxy}
-
-        try:
-            response = requests.get("http://icanhazip.com", proxies=proxy_dict, timeout=5)
-            if response.status_code == 200:
-                return proxy
-        except requests.RequestException:
-            pass  # Ignore failed proxies
+        if proxy_works(proxy):
+            return proxy
     return None
 
-def get_random_proxy():
-    global proxies_list, original_proxy_count
-
-    with proxies_lock:
-        if not proxies_list:
-            proxies_list = load_proxies()
-        current_proxy_count = len(proxies_list)
-
-    if current_proxy_count < (original_proxy_count / 2):
-        with reload_lock:
-            with proxies_lock:
-                if len(proxies_list) < (original_proxy_count / 2):
-                    print("Proxy count dropped below 50%. Retesting proxies.")
-                    proxies_list = load_proxies()
-
-    if not proxies_list:
-        raise ValueError("No proxies available.")
-
-    with proxies_lock:
-        proxy_choice = random.choice(list(proxies_list))
-    return {"http": proxy_choice, "https": proxy_choice}
-
-def fetch_page(url, session):
-    global failed_urls
-    retries = 0  # Keep track of how many retries we have attempted
-
-    while retries < max_retries:
-        proxy = get_random_proxy()
-        try:
-            response = session.get(url, proxies=proxy)
-
-            # Success case: return the content if the response is good
-            if response.status_code == 200 and response.content:
-                return response.content
-
-            # Handle specific HTTP errors without printing
-            if response.status_code in [403, 404]:
-                # Non-recoverable error; no need to retry
-                return None
-
-            if response.status_code in [500, 502, 503, 504]:
-                retries += 1
-                wait_time = min(1.5 ** retries, max_wait_time)
-                # Only print on the last retry
-                if retries == max_retries:
-                    print(f"Error for {url}: Status code {response.status_code}, reached max retries ({max_retries}).")
-                time.sleep(wait_time)
-
-        except requests.exceptions.Timeout:
-            retries += 1
-            # Only print on the last retry
-            if retries == max_retries:
-                print(f"Timeout occurred for {url}, reached max retries ({max_retries}).")
-            time.sleep(retry_delay)
-
-        except requests.exceptions.ProxyError:
-            retries += 1
-            # Only print on the last retry
-            if retries == max_retries:
-                print(f"Proxy error for {url}, reached max retries ({max_retries}).")
-            time.sleep(retry_delay)
-
-        except requests.exceptions.RequestException as e:
-            retries += 1
-            # Only print on the last retry
-            if retries == max_retries:
-                print(f"Request error for {url}: {e}, reached max retries ({max_retries}).")
-            time.sleep(retry_delay)
-
-    else:
-        # Only print once when all retries have been exhausted
-        print(f"Failed to fetch {url} after {max_retries} retries. Saving to failed_urls.json")
-        with failed_urls_lock:
-            failed_urls.append(url)
-            save_failed_urls(failed_urls)
-        return None
-
-def save_failed_urls(failed_urls):
-    """Save the failed URLs to a JSON file in the RAW_DATA_DIR directory."""
-    failed_urls_file = os.path.join(RAW_DATA_DIR, 'failed_urls.json')
-    save_json(failed_urls, failed_urls_file, append=False)
+def proxy_works(proxy):
+    """Check if a proxy URL can reach icanhazip.com."""
+    try:
+        response = requests.get("http://icanhazip.com", proxies={"http": proxy, "https": proxy}, timeout=5)
+        return response.status_code == 200
+    except requests.RequestException:
+        return False  # Ignore failed proxies
+
+# Shared across every scraper and loaded on first use; ejected proxies are
+# revalidated in the background
+proxy_pool = ProxyPool(load_proxies, proxy_works)
+
+def record_failed_url(url):
+    """Append a URL that exhausted its retries to failed_urls.jsonl in the RAW_DATA_DIR directory."""
+    with failed_urls_lock:
+        if not failed_urls.is_open:
+            failed_urls.open()
+        failed_urls.add(url)
+
+def close_failed_urls():
+    """Close failed_urls.jsonl so the next failure starts a new list."""
+    with failed_urls_lock:
+        if failed_urls.is_open:
+            failed_urls.close()
 
 def format_time(seconds):
     """Format time (in seconds) into hours, minutes, and seconds."""
@@ -218,30 +145,7 @@ def print_progress(task_name, progress_data):
         progress_data["last_print_time"] = current_time
         progress_data["last_logged_percentage"] = percentage_done
 
-def save_json(data, filename, append=False):
-    """Save data to a JSON file, appending if required."""
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    if append and os.path.exists(filename):
-        with open(filename, 'r+', encoding='utf-8') as file:
-            try:
-                existing_data = json.load(file)
-            except json.JSONDecodeError:
-                existing_data = []
-            if isinstance(existing_data, list):
-                existing_data.extend(data)
-            else:
-                existing_data = data
-            file.seek(0)
-            json.dump(existing_data, file, indent=4)
-            file.truncate()
-    else:
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=4)
-
 def load_json(filename):
     """Load data from a JSON file."""
     with open(filename, 'r', encoding='utf-8') as file:
         return json.load(file)
-
-# Initialize proxies once at the beginning
-proxies_list = load_proxies()
@@ -0,0 +1,260 @@
+"""Load-test the API in-process with the frontend's request mix over synthetic athletes data.
+
+Every scale gets a synthetic athletes.csv (reused from --data-dir when it
+is already there) and is served by a fresh interpreter, so the peak RSS
+reported covers loading and serving that scale only. Virtual users replay
+what frontend/app/page.tsx does: each view fetches the API root, the
+filtered count and one 25-row page, the first view also loads the NOC
+countries and host cities, and users page through results, pick a game or
+role, type a name one keystroke (one view) at a time and open athlete
+details. Run from backend/:
+
+    python -m benchmarks.api_load --rows 100000 1000000 10000000 --output results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import write_athletes_csv
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "data")
+
+# The frontend's page size, and the static files its first view loads
+ITEMS_PER_PAGE = 25
+STATIC_FILES = ["host_cities.csv", "noc_countries.csv"]
+
+# What a user does after the first view, with relative weights
+ACTIONS = {
+    "next_page": 30,
+    "jump_page": 10,
+    "game": 20,
+    "role": 5,
+    "search": 15,
+    "clear": 5,
+    "detail": 15,
+}
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+def latency_summary(milliseconds: list) -> dict:
+    values = np.asarray(milliseconds)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "requests": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+def prepare_data_dir(data_dir: str, rows: int, seed: int) -> str:
+    """Fill a data directory with a synthetic athletes.csv and the real static files."""
+    csv_path = os.path.join(data_dir, "athletes.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows} synthetic rows in {csv_path}...", file=sys.stderr)
+        write_athletes_csv(csv_path + ".tmp", rows, seed)
+        os.replace(csv_path + ".tmp", csv_path)
+    for name in STATIC_FILES:
+        if not os.path.exists(os.path.join(data_dir, name)):
+            shutil.copy(os.path.join(DATA_DIR, name), data_dir)
+    return csv_path
+
+class UserSession:
+    """One virtual user browsing the athletes table like the frontend does."""
+
+    def __init__(self, client, rng: np.random.Generator, choices: dict, latencies: dict, errors: dict):
+        self.client = client
+        self.rng = rng
+        self.choices = choices
+        self.latencies = latencies
+        self.errors = errors
+        self.filters = {}
+        self.page = 1
+        self.total_pages = 1
+        self.athletes = []
+
+    async def get(self, label: str, url: str, params: dict = None):
+        started = time.perf_counter()
+        response = await self.client.get(url, params=params)
+        self.latencies.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return None
+        return response.json()
+
+    async def view(self, first: bool = False):
+        """The requests page.tsx sends whenever its filters or page change."""
+        await self.get("root", "/")
+        if first:
+            await self.get("noc_countries", "/noc-countries")
+            await self.get("host_cities", "/host-cities")
+        count = await self.get("athletes_count", "/athletes/count", self.filters)
+        if count:
+            self.total_pages = max(1, -(-count["total_records"] // ITEMS_PER_PAGE))
+        params = {"skip": (self.page - 1) * ITEMS_PER_PAGE, "limit": ITEMS_PER_PAGE, **self.filters}
+        page = await self.get("athletes", "/athletes", params)
+        self.athletes = page["athletes"] if page else []
+
+    def pick(self, values):
+        return values[self.rng.integers(len(values))]
+
+    async def act(self, action: str):
+        if action == "next_page":
+            self.page = min(self.page + 1, self.total_pages)
+        elif action == "jump_page":
+            self.page = int(self.rng.integers(1, self.total_pages + 1))
+        elif action in ("game", "role"):
+            self.filters[action] = self.pick(self.choices[action])
+            self.page = 1
+        elif action == "clear":
+            self.filters, self.page = {}, 1
+        elif action == "search":
+            # Searching isn't debounced, so every keystroke is a view
+            term = self.pick(self.choices["name"]).split()[-1][:int(self.rng.integers(2, 7))]
+            self.page = 1
+            for length in range(1, len(term) + 1):
+                self.filters["name"] = term[:length]
+                await self.view()
+            return
+        elif action == "detail":
+            if self.athletes:
+                await self.get("athlete_detail", f"/athletes/{self.pick(self.athletes)['id']}")
+            return
+        await self.view()
+
+    async def run(self, actions: int):
+        await self.view(first=True)
+        names, weights = list(ACTIONS), np.array(list(ACTIONS.values()), dtype=float)
+        for action in self.rng.choice(names, size=actions, p=weights / weights.sum()):
+            await self.act(str(action))
+
+async def drive(app, choices: dict, users: int, actions: int, concurrency: int, seed: int) -> tuple:
+    import httpx
+
+    latencies, errors = {}, {}
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def user(index):
+            async with limit:
+                session = UserSession(client, np.random.default_rng([seed, index]), choices, latencies, errors)
+                await session.run(actions)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(index) for index in range(users)))
+        seconds = time.perf_counter() - started
+    return latencies, errors, seconds
+
+def serve(users: int, actions: int, concurrency: int, seed: int) -> dict:
+    """Load the data directory named by OLYMPICS_DATA_DIR and replay the request mix against it."""
+    from app import main
+
+    started = time.perf_counter()
+    store = main.athlete_snapshots.get().data
+    load_seconds = time.perf_counter() - started
+    rss_after_load = peak_rss_mb()
+
+    df = store.df
+    choices = {
+        "game": sorted(str(value) for value in df["game"].dropna().unique()),
+        "role": sorted(str(value) for value in df["roles"].dropna().unique()),
+        "name": [str(value) for value in df["name"].dropna().drop_duplicates().head(20000)],
+    }
+    latencies, errors, seconds = asyncio.run(drive(main.app, choices, users, actions, concurrency, seed))
+
+    requests = sum(len(values) for values in latencies.values())
+    return {
+        "rows": len(df),
+        "csv_bytes": os.path.getsize(main.ATHLETES_CSV),
+        "load_seconds": round(load_seconds, 3),
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(requests / seconds, 1),
+        "latency_ms": {
+            "all": latency_summary([value for values in latencies.values() for value in values]),
+            **{label: latency_summary(values) for label, values in sorted(latencies.items())},
+        },
+        "peak_rss_mb": {"after_load": rss_after_load, "after_requests": peak_rss_mb()},
+    }
+
+def run_scale(data_dir: str, args) -> dict:
+    """Serve one data directory from a fresh interpreter and return its results."""
+    command = [
+        sys.executable, "-m", "benchmarks.api_load", "--serve",
+        "--users", str(args.users), "--actions", str(args.actions),
+        "--concurrency", str(args.concurrency), "--seed", str(args.seed),
+    ]
+    env = {**os.environ, "OLYMPICS_DATA_DIR": data_dir}
+    output = subprocess.run(command, env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        sys.stderr.write(output.stderr)
+        raise RuntimeError(f"Serving {data_dir} failed with exit code {output.returncode}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def run(args, work_dir: str) -> dict:
+    results = {
+        "config": {
+            "users": args.users,
+            "actions": args.actions,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "athletes_store_mode": os.getenv("ATHLETES_STORE_MODE", "categorical"),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "scales": {},
+    }
+    for rows in args.rows:
+        data_dir = os.path.join(work_dir, f"athletes_{rows}")
+        os.makedirs(data_dir, exist_ok=True)
+        prepare_data_dir(data_dir, rows, args.seed)
+        print(f"Serving {rows} rows...", file=sys.stderr)
+        results["scales"][str(rows)] = run_scale(data_dir, args)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000, 10000000], help="Rows of each synthetic athletes.csv")
+    parser.add_argument("--data-dir", help="Keep the synthetic data here and reuse it on later runs (a temporary directory otherwise)")
+    parser.add_argument("--users", type=int, default=100, help="Virtual users, each starting with a first view")
+    parser.add_argument("--actions", type=int, default=20, help="Actions per user after the first view")
+    parser.add_argument("--concurrency", type=int, default=8, help="Users browsing at the same time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        print(json.dumps(serve(args.users, args.actions, args.concurrency, args.seed)))
+        sys.exit(0)
+
+    if args.data_dir:
+        results = run(args, args.data_dir)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run(args, work_dir)
+
+    report = json.dumps(results, indent=4)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
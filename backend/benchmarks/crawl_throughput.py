@@ -0,0 +1,151 @@
+"""Run the full data pipeline against the local olympedia stand-in and report crawl throughput.
+
+The stand-in (benchmarks.olympedia_standin) runs in its own process with the
+given site size and fault injection; the pipeline runs in this one, in a
+scratch directory, with OLYMPEDIA_BASE_URL and PROXY_URL pointing at the
+stand-in so every page goes through its fake proxies. Reported: pages per
+second overall and for the crawl stage, retries (requests repeated after a
+failure), CPU seconds per page (parse workers included) and peak
+RSS, plus the stand-in's request counters and each stage's status. Options
+other than --work-dir and --output are the stand-in's (see
+python -m benchmarks.olympedia_standin --help). Run from backend/:
+
+    python -m benchmarks.crawl_throughput --countries 50 --error-503 0.02 --output crawl.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import resource
+import tempfile
+import subprocess
+import urllib.request
+from benchmarks.olympedia_standin import add_arguments
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+def start_standin(port: int, argv: list) -> subprocess.Popen:
+    """Start the stand-in and wait until it answers."""
+    command = [sys.executable, "-m", "benchmarks.olympedia_standin", "--port", str(port)] + argv
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            get_json(f"http://127.0.0.1:{port}/_stats")
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("The olympedia stand-in did not start")
+            time.sleep(0.1)
+
+def cpu_seconds() -> float:
+    # Children are the parse worker processes, counted once they have exited
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(item.ru_utime + item.ru_stime for item in usage)
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+def count_lines(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as file:
+        return sum(1 for line in file if line.strip())
+
+def run_pipeline(base_url: str, work_dir: str) -> dict:
+    """Run the API's pipeline in work_dir against base_url and return its run record."""
+    os.environ["OLYMPEDIA_BASE_URL"] = base_url
+    os.environ["PROXY_URL"] = f"{base_url}/proxies.txt"
+    os.environ["OLYMPICS_DATA_DIR"] = os.path.join(work_dir, "data")
+    os.environ["OLYMPICS_RAW_DATA_DIR"] = os.path.join(work_dir, "raw_data")
+
+    from app import main
+
+    main.ensure_directories()
+    run = main.run_pipeline()
+    run["crawl_frontier"] = main.crawl_frontier.stats() if main.crawl_frontier else None
+    return run
+
+def run(site_args, standin_argv: list, work_dir: str) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    standin = start_standin(port, standin_argv)
+    try:
+        cpu_started = cpu_seconds()
+        started = time.perf_counter()
+        pipeline_run = run_pipeline(base_url, work_dir)
+        seconds = time.perf_counter() - started
+        # Measured before the stand-in exits so it isn't counted among our children
+        cpu = cpu_seconds() - cpu_started
+        peak_rss = {"pipeline": peak_rss_mb(), "parse_workers": peak_rss_mb(resource.RUSAGE_CHILDREN)}
+        server = get_json(f"{base_url}/_stats")
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    pages = server["by_status"].get("200", 0)
+    page_requests = sum(server["by_kind"].values()) - server["by_kind"].get("unknown", 0)
+    crawl_seconds = pipeline_run["stages"]["crawl"]["seconds"]
+    crawled = sum(server["by_kind"].get(kind, 0) for kind in ("country", "event", "athlete"))
+    # Imported by the pipeline run; the list lives wherever the fetchers wrote it
+    from app import utils
+    return {
+        "config": {
+            **vars(site_args),
+            "crawl_rate_limit": os.getenv("CRAWL_RATE_LIMIT", "50"),
+            "parser_backend": os.getenv("PARSER_BACKEND", "bs4"),
+            "cpus": os.cpu_count(),
+        },
+        "seconds": round(seconds, 3),
+        "pages": pages,
+        "pages_per_second": round(pages / seconds, 1),
+        "crawl_pages_per_second": round(crawled / crawl_seconds, 1) if crawl_seconds else None,
+        "page_requests": page_requests,
+        "retries": server["retries"],
+        "failed_urls": count_lines(utils.failed_urls.path),
+        "athlete_rows": max(0, count_lines(os.path.join(os.environ["OLYMPICS_DATA_DIR"], "athletes.csv")) - 1),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_ms_per_page": round(cpu * 1000 / pages, 3) if pages else None,
+        "peak_rss_mb": peak_rss,
+        "standin": server,
+        "stages": pipeline_run["stages"],
+        "crawl_frontier": pipeline_run["crawl_frontier"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--work-dir", help="Keep the pipeline's output here (a temporary directory otherwise; must be empty)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args, standin_argv = parser.parse_known_args()
+    # Validated here so a typo fails before anything starts
+    site_parser = argparse.ArgumentParser(prog=f"{parser.prog} (stand-in options)")
+    add_arguments(site_parser)
+    site_args = site_parser.parse_args(standin_argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        results = run(site_args, standin_argv, os.path.abspath(args.work_dir))
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run(site_args, standin_argv, work_dir)
+
+    report = json.dumps(results, indent=4)
+    print(report)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
@@ -0,0 +1,80 @@
+"""Measure API import and startup time against importing the scraping subsystem too.
+
+Each measurement runs in a fresh interpreter. "api" is what a worker pays
+before serving; "api_with_scrapers" adds the scraping modules the API used
+to import eagerly. With --with-proxies the proxy download and check that
+used to run on every import is timed as well (needs PROXY_URL).
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ["bs4", "lxml", "requests", "aiohttp", "app.utils"]
+
+SCRAPER_MODULES = [
+    "app.async_fetch",
+    "app.url_scraping.countries",
+    "app.url_scraping.events",
+    "app.url_scraping.athletes",
+    "app.data_scraping.athletes_scraper",
+    "app.data_scraping.host_cities_scraper",
+    "app.data_scraping.noc_countries_scraper",
+    "app.data_scraping.roles_scraper",
+]
+
+SNIPPET = """
+import sys, json, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter() - start
+{startup}
+print(json.dumps({{
+    "import_seconds": imported,
+    "startup_seconds": time.perf_counter() - start,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+# Runs the startup hooks and serves one request
+STARTUP = """
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/status").raise_for_status()
+"""
+
+def measure(imports: list, startup: str = "", repeat: int = 5) -> dict:
+    code = SNIPPET.format(
+        imports="\n".join(f"import {module}" for module in imports),
+        startup=startup,
+        heavy=HEAVY_MODULES,
+    )
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_seconds": round(statistics.median(run["import_seconds"] for run in runs), 3),
+        "startup_seconds": round(statistics.median(run["startup_seconds"] for run in runs), 3),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+def measure_proxy_load() -> dict:
+    code = "import time; from app import utils; start = time.perf_counter(); utils.proxy_pool.load(); print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return {"proxy_load_seconds": round(float(output.strip().splitlines()[-1]), 3)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--with-proxies", action="store_true", help="Also time loading and checking the proxy list")
+    args = parser.parse_args()
+
+    results = {
+        "api": measure(["app.main"], STARTUP, args.repeat),
+        "api_with_scrapers": measure(["app.main"] + SCRAPER_MODULES, STARTUP, args.repeat),
+    }
+    if args.with_proxies:
+        results.update(measure_proxy_load())
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,52 @@
+"""Compare cold-load time of athletes.csv against the partitioned Parquet dataset."""
+import os
+import json
+import time
+import argparse
+import tempfile
+from app.athlete_store import (
+    AthleteStore,
+    read_athletes_csv,
+    read_athletes_dataset,
+    write_athletes_dataset,
+)
+from app.data_version import get_data_version
+from benchmarks.synthetic_data import write_athletes_csv
+
+def timed(function, *args, repeat=3, **kwargs):
+    """Run a function `repeat` times, returning its last result and the best wall time."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def run(csv_path: str, dataset_dir: str, repeat: int) -> dict:
+    write_athletes_dataset(csv_path, dataset_dir, get_data_version(csv_path))
+
+    results = {"rows": None, "csv_bytes": os.path.getsize(csv_path)}
+    for label, reader, path in [("csv", read_athletes_csv, csv_path), ("parquet", read_athletes_dataset, dataset_dir)]:
+        df, read_seconds = timed(reader, path, repeat=repeat)
+        store, build_seconds = timed(AthleteStore, df, repeat=1)
+        game = df['game'].dropna().iloc[0]
+        _, filter_seconds = timed(store.filter_positions, game=game, repeat=repeat)
+        results["rows"] = len(df)
+        results[label] = {
+            "read_seconds": round(read_seconds, 3),
+            "index_build_seconds": round(build_seconds, 3),
+            "game_filter_ms": round(filter_seconds * 1000, 3),
+        }
+    results["read_speedup"] = round(results["csv"]["read_seconds"] / results["parquet"]["read_seconds"], 2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", help="Existing athletes.csv (a synthetic one is generated otherwise)")
+    parser.add_argument("--rows", type=int, default=350000, help="Rows of the synthetic athletes.csv")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = args.csv or write_athletes_csv(os.path.join(work_dir, "athletes.csv"), args.rows)
+        print(json.dumps(run(csv_path, os.path.join(work_dir, "athletes_dataset"), args.repeat), indent=4))
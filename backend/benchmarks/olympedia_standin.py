@@ -0,0 +1,215 @@
+"""Local stand-in for olympedia.org serving the fixture pages, with latency, errors and a fake proxy.
+
+The site is generated: /countries lists the first --countries NOCs from
+data/noc_countries.csv, every country page lists --editions editions, and
+every event page lists --athletes-per-event athletes, a quarter of them
+shared with the previous event so URL deduplication is exercised. Country
+and event pages are the recorded fixtures with their tables filled in;
+athlete pages are the recorded athlete fixtures served in rotation.
+/editions is built from data/host_cities.csv.
+
+Every request waits a random --latency-ms and may be answered with a 500
+or 503, or left hanging for --timeout-seconds. /proxies.txt lists --proxies
+fake proxies in the ip:port:user:password format load_proxies expects; they
+all point back at this server, which answers proxied requests itself
+(including the proxy check against icanhazip.com) and drops the connection
+for --proxy-failure-rate of them. /_stats returns the request counters, where
+hanging requests show up as 504s and retries are requests for a page whose
+previous request failed.
+
+    python -m benchmarks.olympedia_standin --port 8765
+    OLYMPEDIA_BASE_URL=http://127.0.0.1:8765 PROXY_URL=http://127.0.0.1:8765/proxies.txt ...
+"""
+import os
+import re
+import random
+import asyncio
+import argparse
+from typing import Optional
+import pandas as pd
+from aiohttp import web
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures", "olympedia")
+DATA_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "data")
+
+COUNTRY_FIXTURE = "countries__NOR.html"
+EVENT_FIXTURE = "countries__ANZ__editions__4.html"
+
+PAGE_KINDS = [
+    ("country_index", re.compile(r"^/countries$")),
+    ("editions", re.compile(r"^/editions$")),
+    ("country", re.compile(r"^/countries/(?P<noc>[^/]+)$")),
+    ("event", re.compile(r"^/countries/(?P<noc>[^/]+)/editions/(?P<edition>\d+)$")),
+    ("athlete", re.compile(r"^/athletes/(?P<athlete_id>\d+)$")),
+]
+
+def read_fixture(file_name: str) -> bytes:
+    # Served as recorded; not every fixture is UTF-8
+    with open(os.path.join(FIXTURES_DIR, file_name), "rb") as file:
+        return file.read()
+
+def with_rows(page: str, rows: list) -> str:
+    """Replace the rows of a fixture page's table body."""
+    return re.sub(r"<tbody>.*?</tbody>", lambda _: "<tbody>\n" + "\n".join(rows) + "\n</tbody>", page, count=1, flags=re.S)
+
+class OlympediaSite:
+    """The generated site: which countries, editions and athletes exist, and their pages."""
+
+    def __init__(self, countries: int, editions: int, athletes_per_event: int):
+        nocs = pd.read_csv(os.path.join(DATA_DIR, "noc_countries.csv"), keep_default_na=False)
+        self.countries = list(zip(nocs["noc"], nocs["country"]))[:countries]
+        self.country_index = {noc: index for index, (noc, _) in enumerate(self.countries)}
+        self.games = pd.read_csv(os.path.join(DATA_DIR, "host_cities.csv"))
+        self.editions = min(editions, len(self.games))
+        self.athletes_per_event = athletes_per_event
+        # Consecutive events share a quarter of their athletes
+        self.stride = max(1, athletes_per_event - athletes_per_event // 4)
+
+        self.country_page = read_fixture(COUNTRY_FIXTURE).decode("utf-8")
+        self.event_page = read_fixture(EVENT_FIXTURE).decode("utf-8")
+        self.athlete_pages = [read_fixture(name) for name in sorted(os.listdir(FIXTURES_DIR)) if name.startswith("athletes__")]
+
+    def athlete_ids(self, noc: str, edition: int) -> range:
+        start = (self.country_index[noc] * self.editions + edition - 1) * self.stride + 1
+        return range(start, start + self.athletes_per_event)
+
+    def athlete_count(self) -> int:
+        """Distinct athletes listed across every event page."""
+        return len(self.countries) * self.editions * self.stride + self.athletes_per_event - self.stride
+
+    def page(self, kind: str, match: re.Match) -> Optional[bytes]:
+        """Return the HTML of a page, or None when it doesn't exist."""
+        if kind == "athlete":
+            athlete_id = int(match["athlete_id"])
+            if not 1 <= athlete_id <= self.athlete_count():
+                return None
+            return self.athlete_pages[athlete_id % len(self.athlete_pages)]
+        content = self.generated_page(kind, match)
+        return content.encode("utf-8") if content is not None else None
+
+    def generated_page(self, kind: str, match: re.Match) -> Optional[str]:
+        if kind == "country_index":
+            rows = [
+                f'<tr><td><a href="/countries/{noc}">{noc}</a></td><td><a href="/countries/{noc}">{name}</a></td>'
+                f'<td><span class="glyphicon glyphicon-ok"></span></td></tr>'
+                for noc, name in self.countries
+            ]
+            return f"<html><body><table><thead><tr><th>Code</th><th>Country</th><th>Competed</th></tr></thead>" \
+                   f"<tbody>{''.join(rows)}</tbody></table></body></html>"
+        if kind == "editions":
+            tables = []
+            for season in ("Summer", "Winter"):
+                games = self.games[self.games["season"] == season]
+                rows = "".join(f"<tr><td>{number}</td><td>{year}</td><td>{city}</td></tr>"
+                               for number, (year, city) in enumerate(zip(games["year"], games["host_city"]), 1))
+                tables.append(f"<table><tr><th>#</th><th>Year</th><th>City</th></tr>{rows}</table>")
+            return f"<html><body>{''.join(tables)}</body></html>"
+
+        noc = match.groupdict().get("noc")
+        if noc is not None and noc not in self.country_index:
+            return None
+        if kind == "country":
+            rows = [
+                f'<tr><td><a href="/editions/{edition}">{self.games["game"].iloc[edition - 1]}</a></td>'
+                f'<td><a href="/countries/{noc}/editions/{edition}">{self.athletes_per_event}</a></td>'
+                f'<td>0</td><td>0</td><td>0</td><td>0</td></tr>'
+                for edition in range(1, self.editions + 1)
+            ]
+            return with_rows(self.country_page, rows)
+        if kind == "event":
+            edition = int(match["edition"])
+            if not 1 <= edition <= self.editions:
+                return None
+            rows = [f'<tr><td><a href="/athletes/{athlete_id}">Athlete {athlete_id}</a></td><td>Athletics</td></tr>'
+                    for athlete_id in self.athlete_ids(noc, edition)]
+            return with_rows(self.event_page, rows)
+        return None
+
+def create_app(site: OlympediaSite, args) -> web.Application:
+    rng = random.Random(args.seed)
+    stats = {"requests": 0, "proxied": 0, "proxy_failures": 0, "timeouts": 0, "retries": 0, "by_kind": {}, "by_status": {}}
+    # Pages whose last request failed; asking for them again is a retry
+    failed = set()
+
+    def count(kind: str, status: int, path: str):
+        stats["by_kind"][kind] = stats["by_kind"].get(kind, 0) + 1
+        stats["by_status"][str(status)] = stats["by_status"].get(str(status), 0) + 1
+        if status >= 500:
+            failed.add(path)
+        else:
+            failed.discard(path)
+        return status
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        stats["requests"] += 1
+        path = request.path.rstrip("/") or "/"
+        if path in failed:
+            stats["retries"] += 1
+        if "Proxy-Authorization" in request.headers:
+            stats["proxied"] += 1
+            if rng.random() < args.proxy_failure_rate:
+                # A dead proxy: the client sees the connection drop
+                stats["proxy_failures"] += 1
+                failed.add(path)
+                request.transport.close()
+                raise asyncio.CancelledError()
+            if request.host.startswith("icanhazip.com"):
+                return web.Response(text="127.0.0.1\n")
+
+        if path == "/_stats":
+            return web.json_response(stats)
+        if path == "/proxies.txt":
+            host, port = request.host.split(":")
+            lines = [f"{host}:{port}:user{index}:password" for index in range(args.proxies)]
+            return web.Response(text="\n".join(lines) + "\n")
+
+        kind, match = next(((kind, pattern.match(path)) for kind, pattern in PAGE_KINDS if pattern.match(path)), (None, None))
+        if kind is None:
+            return web.Response(status=count("unknown", 404, path))
+
+        await asyncio.sleep(rng.uniform(*args.latency_ms) / 1000)
+        draw = rng.random()
+        if draw < args.timeout_rate:
+            stats["timeouts"] += 1
+            await asyncio.sleep(args.timeout_seconds)
+            return web.Response(status=count(kind, 504, path))
+        elif draw < args.timeout_rate + args.error_500:
+            return web.Response(status=count(kind, 500, path))
+        elif draw < args.timeout_rate + args.error_500 + args.error_503:
+            return web.Response(status=count(kind, 503, path))
+
+        content = site.page(kind, match)
+        if content is None:
+            return web.Response(status=count(kind, 404, path))
+        return web.Response(status=count(kind, 200, path), body=content, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    return app
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Site and fault-injection options, shared with benchmarks.crawl_throughput."""
+    parser.add_argument("--countries", type=int, default=20, help="Countries listed on /countries")
+    parser.add_argument("--editions", type=int, default=5, help="Editions listed on every country page")
+    parser.add_argument("--athletes-per-event", type=int, default=40, help="Athletes listed on every event page")
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=[5, 30], metavar=("MIN", "MAX"), help="Uniform response delay")
+    parser.add_argument("--error-500", type=float, default=0.0, help="Share of page requests answered with a 500")
+    parser.add_argument("--error-503", type=float, default=0.0, help="Share of page requests answered with a 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of page requests left hanging")
+    parser.add_argument("--timeout-seconds", type=float, default=35, help="How long hanging requests hang (the crawler gives up after 30s)")
+    parser.add_argument("--proxies", type=int, default=10, help="Fake proxies listed on /proxies.txt")
+    parser.add_argument("--proxy-failure-rate", type=float, default=0.0, help="Share of proxied requests whose connection is dropped")
+    parser.add_argument("--seed", type=int, default=0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    site = OlympediaSite(args.countries, args.editions, args.athletes_per_event)
+    print(f"Serving {len(site.countries)} countries, {site.editions} editions each and "
+          f"{site.athlete_count()} athletes on http://{args.host}:{args.port}", flush=True)
+    web.run_app(create_app(site, args), host=args.host, port=args.port, print=None, access_log=None)
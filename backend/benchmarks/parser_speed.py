@@ -0,0 +1,102 @@
+"""Compare the bs4 and lxml parser backends on saved olympedia pages.
+
+Every page is parsed with both backends first and the outputs must match;
+then each backend is timed and reported in pages per second. Pages come
+from the bundled fixtures, or from a page archive written by the crawler
+(--archive raw_data/pages) to use the real site.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from app.data_scraping.athletes_scraper import parse_athlete_page
+from app.html_parsers import PARSER_BACKENDS
+from app.page_archive import PageArchive
+from app.url_scraping.athletes import parse_athlete_urls
+from app.url_scraping.events import parse_event_urls
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "olympedia")
+BASE_URL = "https://www.olympedia.org"
+
+# Fixture file names are URL paths with "/" written as "__"
+PAGE_KINDS = {
+    "athlete": (parse_athlete_page, re.compile(r"/athletes/\d+$")),
+    "country": (lambda content, url: parse_event_urls(content, BASE_URL), re.compile(r"/countries/[^/]+$")),
+    "event": (lambda content, url: parse_athlete_urls(content, BASE_URL), re.compile(r"/countries/[^/]+/editions/\d+$")),
+}
+
+def page_kind(url):
+    return next((kind for kind, (_, pattern) in PAGE_KINDS.items() if pattern.search(url)), None)
+
+def load_fixtures() -> dict:
+    """Return {kind: [(url, content)]} for the bundled fixture pages."""
+    pages = {kind: [] for kind in PAGE_KINDS}
+    for file_name in sorted(os.listdir(FIXTURES_DIR)):
+        url = f"{BASE_URL}/{file_name.removesuffix('.html').replace('__', '/')}"
+        with open(os.path.join(FIXTURES_DIR, file_name), "rb") as file:
+            pages[page_kind(url)].append((url, file.read()))
+    return pages
+
+def load_archive(archive_dir: str, limit: int) -> dict:
+    """Return {kind: [(url, content)]} for up to `limit` archived pages of each kind."""
+    archive = PageArchive(archive_dir)
+    pages = {kind: [] for kind in PAGE_KINDS}
+    for url in archive.entries:
+        kind = page_kind(url)
+        if kind and len(pages[kind]) < limit:
+            pages[kind].append((url, archive.read(url)))
+    return pages
+
+def parse_all(parse, pages, backend):
+    os.environ["PARSER_BACKEND"] = backend
+    results = []
+    for url, content in pages:
+        try:
+            results.append(parse(content, url))
+        except Exception as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+def compare(pages: dict) -> list:
+    """Return the URLs whose parsed output differs between the backends."""
+    mismatches = []
+    for kind, (parse, _) in PAGE_KINDS.items():
+        outputs = [parse_all(parse, pages[kind], backend) for backend in PARSER_BACKENDS]
+        for (url, _), *results in zip(pages[kind], *outputs):
+            if any(result != results[0] for result in results[1:]):
+                mismatches.append(url)
+    return mismatches
+
+def measure(pages: dict, min_seconds: float) -> dict:
+    results = {}
+    for kind, (parse, _) in PAGE_KINDS.items():
+        if not pages[kind]:
+            continue
+        results[kind] = {"pages": len(pages[kind])}
+        for backend in PARSER_BACKENDS:
+            parsed, start = 0, time.perf_counter()
+            while True:
+                parse_all(parse, pages[kind], backend)
+                parsed += len(pages[kind])
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_seconds:
+                    break
+            results[kind][f"{backend}_pages_per_second"] = round(parsed / elapsed, 1)
+        results[kind]["speedup"] = round(results[kind]["lxml_pages_per_second"] / results[kind]["bs4_pages_per_second"], 2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--archive", help="Page archive directory to read pages from instead of the fixtures")
+    parser.add_argument("--limit", type=int, default=2000, help="Pages of each kind to read from the archive")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Minimum time to spend per backend and page kind")
+    args = parser.parse_args()
+
+    pages = load_archive(args.archive, args.limit) if args.archive else load_fixtures()
+    mismatches = compare(pages)
+    results = measure(pages, args.seconds)
+    results["mismatches"] = mismatches
+    print(json.dumps(results, indent=4))
+    sys.exit(1 if mismatches else 0)
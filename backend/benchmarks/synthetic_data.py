@@ -0,0 +1,128 @@
+"""Synthetic athletes.csv generator matching the schema written by the scraper."""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "id", "name", "gender", "born", "died", "height", "weight", "noc", "roles",
+    "game", "team", "sport", "event", "position", "image_url"
+]
+
+SUMMER_YEARS = [1896, 1900, 1904, 1908, 1912, 1920, 1924, 1928, 1932, 1936, 1948, 1952, 1956, 1960,
+                1964, 1968, 1972, 1976, 1980, 1984, 1988, 1992, 1996, 2000, 2004, 2008, 2012, 2016,
+                2020, 2024]
+WINTER_YEARS = [1924, 1928, 1932, 1936, 1948, 1952, 1956, 1960, 1964, 1968, 1972, 1976, 1980, 1984,
+                1988, 1992, 1994, 1998, 2002, 2006, 2010, 2014, 2018, 2022]
+GAMES = [f"{year} Summer Olympics" for year in SUMMER_YEARS] + [f"{year} Winter Olympics" for year in WINTER_YEARS]
+
+SPORTS = [
+    "Athletics", "Swimming", "Rowing", "Gymnastics", "Fencing", "Cycling Road", "Cycling Track",
+    "Shooting", "Wrestling", "Boxing", "Sailing", "Canoe Sprint", "Equestrian Jumping", "Football",
+    "Hockey", "Basketball", "Volleyball", "Weightlifting", "Judo", "Diving", "Water Polo", "Handball",
+    "Art Competitions", "Alpine Skiing", "Cross Country Skiing", "Speed Skating", "Ice Hockey",
+    "Biathlon", "Bobsleigh", "Figure Skating", "Ski Jumping", "Luge", "Curling", "Snowboarding",
+]
+EVENTS = ["100 metres, Men", "4 x 100 metres Relay, Women", "Individual, Open", "Team, Men",
+          "Single Sculls, Men", "All-Around, Individual, Women", "Heavyweight, Men", "Downhill, Women"]
+NOCS = ["USA", "GBR", "FRA", "GER", "ITA", "CAN", "AUS", "SWE", "JPN", "URS", "HUN", "NED", "SUI",
+        "NOR", "FIN", "CHN", "ESP", "POL", "BRA", "AUT", "BEL", "DEN", "RUS", "KOR", "NZL", "ARG",
+        "MEX", "CZE", "TCH", "RSA", "GDR", "FRG", "IND", "KEN", "JAM", "CUB", "NGR", "EGY", "TUR"]
+POSITIONS = ["1", "2", "3", "4", "5", "6", "7", "8", "=9", "10", "13 r1/4", "AC", "DNS", "DNF", "DQ", "HM"]
+POSITION_WEIGHTS = np.array([6, 6, 6, 5, 5, 5, 5, 5, 4, 4, 8, 10, 3, 4, 1, 1], dtype=float)
+ROLES = ["Competed in Olympic Games", "Competed in Olympic Games • Coach", "Competed in Olympic Games • Referee",
+         "Competed in Olympic Games (non-medal events)", "Non-starter", "Coach", "Competed in Intercalated Games"]
+ROLE_WEIGHTS = np.array([78, 4, 2, 3, 4, 1, 2], dtype=float)
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+SYLLABLES = ["an", "ber", "cho", "da", "el", "fi", "go", "han", "is", "jo", "ka", "li", "mar", "no",
+             "ol", "pe", "qui", "ro", "sa", "ta", "u", "vik", "wa", "xa", "ya", "zo"]
+
+def random_words(rng, count, syllables):
+    """Build capitalized pseudo-words from the syllable table."""
+    parts = rng.choice(SYLLABLES, size=(count, syllables))
+    return np.array(["".join(row).capitalize() for row in parts], dtype=object)
+
+def pick(rng, values, size, weights=None):
+    """Draw values (optionally weighted) as an object array."""
+    p = None if weights is None else weights / weights.sum()
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)]
+
+def generate_athletes(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate roughly `rows` participation rows with the scraper's column layout.
+
+    Each athlete gets a geometric number of participations, matching the real
+    data where most athletes compete once or twice.
+    """
+    rng = np.random.default_rng(seed)
+    participations = np.minimum(rng.geometric(0.55, size=rows), 12)
+    athletes = int(np.searchsorted(np.cumsum(participations), rows)) + 1
+    participations = participations[:athletes]
+    participations[-1] -= int(participations.sum()) - rows
+
+    first_names = random_words(rng, 4000, 2)
+    last_names = random_words(rng, 20000, 3)
+    names = first_names[rng.integers(0, len(first_names), athletes)] + " " + last_names[rng.integers(0, len(last_names), athletes)]
+
+    born_year = rng.integers(1850, 2008, athletes)
+    born = np.array([f"{day} {MONTHS[month]} {year}" for day, month, year in
+                     zip(rng.integers(1, 29, athletes), rng.integers(0, 12, athletes), born_year)], dtype=object)
+    died = np.where((born_year < 1950) & (rng.random(athletes) < 0.6), born, None)
+    height = np.where(rng.random(athletes) < 0.7, [f"{h} cm" for h in rng.integers(150, 210, athletes)], None)
+    weight = np.where(rng.random(athletes) < 0.6, [f"{w} kg" for w in rng.integers(45, 130, athletes)], None)
+    noc = pick(rng, NOCS, athletes)
+    image_url = np.where(rng.random(athletes) < 0.3, [f"/images/athletes/{i}.jpg" for i in range(athletes)], None)
+
+    athlete = {
+        # Olympedia ids are mostly dense with occasional gaps
+        "id": np.cumsum(1 + (rng.random(athletes) < 0.05) * rng.integers(1, 50, athletes)),
+        "name": names,
+        "gender": pick(rng, ["Male", "Female"], athletes, np.array([72.0, 28.0])),
+        "born": born,
+        "died": died,
+        "height": height,
+        "weight": weight,
+        "noc": noc,
+        "roles": pick(rng, ROLES, athletes, ROLE_WEIGHTS),
+    }
+    df = pd.DataFrame({column: np.repeat(values, participations) for column, values in athlete.items()})
+
+    sport = pick(rng, SPORTS, athletes)
+    df["game"] = pick(rng, GAMES, rows)
+    df["team"] = np.repeat(noc, participations)
+    df["sport"] = np.repeat(sport, participations)
+    df["event"] = pick(rng, EVENTS, rows) + " (Olympic)"
+    df["position"] = pick(rng, POSITIONS, rows, POSITION_WEIGHTS)
+    df["image_url"] = np.repeat(image_url, participations)
+
+    # The scraper appends athletes in completion order, not by id
+    order = rng.permutation(athletes)
+    starts = np.cumsum(participations) - participations
+    shuffled = participations[order]
+    rows_order = np.arange(rows) - np.repeat(np.cumsum(shuffled) - shuffled, shuffled) + np.repeat(starts[order], shuffled)
+    return df.iloc[rows_order][COLUMNS].reset_index(drop=True)
+
+def write_athletes_csv(file_path: str, rows: int, seed: int = 0, chunk_rows: int = 1000000) -> str:
+    """Write a synthetic athletes.csv with the given number of rows.
+
+    Rows are generated and appended `chunk_rows` at a time so large files
+    (10M rows) don't need the whole frame in memory; ids keep increasing
+    across chunks.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    last_id = 0
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        df = generate_athletes(min(chunk_rows, rows - start), seed + index)
+        df["id"] += last_id
+        last_id = int(df["id"].max())
+        df.to_csv(file_path, index=False, mode="w" if index == 0 else "a", header=index == 0)
+    return file_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="Path of the athletes.csv to write")
+    parser.add_argument("--rows", type=int, default=350000, help="Number of participation rows")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_athletes_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")